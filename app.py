@@ -1,16 +1,59 @@
+import sys
+import time
+import logging
+import importlib
+
 import streamlit as st
 
-from app_home import run_home
-from app_ml import run_ml
-from app_species import species_price
-from app_source import source, source_species, source_price
-from app_llm import run_llm
-from app_ml2 import run_ml2
+import bootstrap
 from app_chatbot import chatbot_popup
 
 
+# ============================================================
+# 페이지 레지스트리
+# ------------------------------------------------------------
+# 메뉴 항목 → (모듈, 순서대로 호출할 함수)
+# 페이지 모듈은 처음 선택될 때 import (Prophet/sklearn/Plotly 등 무거운 의존성을
+# 홈만 보는 사용자가 기동 시점에 부담하지 않도록)
+# ============================================================
+
+PAGES = {
+    '홈': ('app_home', ['run_home']),
+    '어종별 시세': ('app_species', ['species_price', 'show_source']),
+    '산지별 시세': ('app_source', ['source_price', 'source', 'source_species']),  # 산지별 경매가
+    '날짜별 예측': ('app_ml', ['run_ml']),
+    '상세 검색 예측': ('app_ml2', ['run_ml2']),
+    'LLM': ('app_llm', ['run_llm']),
+}
+
+logger = logging.getLogger('app')
+
+
+def load_page(name):
+    """페이지 모듈을 (필요하면 import 해서) 호출할 함수 목록으로 반환
+
+    세션마다 스레드가 다르므로 항상 import_module 을 거침 (import 잠금 -
+    다른 세션이 import 중이면 끝날 때까지 기다림). 최초 import 시간은
+    프로세스 수명 동안 유지되는 bootstrap.IMPORT_TIMES 에 기록
+    """
+    module_name, func_names = PAGES[name]
+    first = module_name not in sys.modules
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    if first:
+        elapsed = bootstrap.IMPORT_TIMES.setdefault(module_name, time.perf_counter() - start)
+        logger.info('page %s import %.2fs', module_name, elapsed)
+    return [getattr(module, f) for f in func_names]
+
+
+def run_page(name):
+    for func in load_page(name):
+        func()
+
+
 
 def main():
+    bootstrap.init()
 
     
     menu = ['홈', '시세 알아보기', '시세 예측하기']
@@ -36,24 +79,22 @@ def main():
         
 
     if choice == menu[0]:
-        run_home()
+        run_page('홈')
     elif choice == menu[1]:
         sub_choice = st.sidebar.selectbox('경매가', sub_menu)
         if sub_choice == sub_menu[0] :
-            species_price() # 어종별 경매가
+            run_page(sub_choice) # 어종별 경매가
         elif sub_choice == sub_menu[1] :
-            source_price()
-            source() # 산지별 경매가
-            source_species()
+            run_page(sub_choice) # 산지별 경매가
         
     elif choice == menu[2]:
         ml_choice = st.sidebar.selectbox('예측 방법', ml_menu)
         if ml_choice == ml_menu[0]:
-            run_ml()
+            run_page(ml_choice)
         elif ml_choice == ml_menu[1]:
-            run_ml2()
+            run_page(ml_choice)
     elif choice == menu[3]:
-        run_llm()
+        run_page('LLM')
 
     #챗봇
     chatbot_popup()
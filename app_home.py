@@ -1,42 +1,64 @@
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
-from koreanize_matplotlib import koreanize
-import datetime
 
-# ============================================================
-# 전역 설정
-# ============================================================
-try:
-    font_path = "/System/Library/Fonts/AppleSDGothicNeo.ttc"
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-except:
-    font_path = "C:/Windows/Fonts/malgun.ttf"
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-rc('font', family=font_name)
-plt.rcParams['axes.unicode_minus'] = False
-plt.style.use('seaborn-v0_8-whitegrid')
-koreanize()
+import chart_cache
+import seasonal
+from data_store import load_home_snapshot
+
+
+MINI_CHART_COLOR = '#667eea'
+
+
+def _mini_chart(species_data, title, color):
+    """최근 30일 평균가 미니 차트 (chart_cache 에 없을 때만 호출)"""
+    fig, ax = plt.subplots(figsize=(4, 2.8))
+
+    ax.plot(species_data['date'], species_data['평균가'], 
+        color=color, linewidth=3, marker='o', markersize=4)
+    ax.fill_between(species_data['date'], species_data['평균가'], 
+                alpha=0.2, color=color)
+
+    ax.set_xlabel('')
+    ax.set_ylabel('')
+    ax.set_title(title, fontsize=15, fontweight='bold', 
+               pad=12, color='#2c3e50')
+    ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
+    ax.tick_params(axis='x', rotation=45, labelsize=9)
+    ax.tick_params(axis='y', labelsize=10)
+
+    ax.set_facecolor('#f8f9fa')
+    fig.patch.set_facecolor('white')
+
+    # 최신 가격 표시
+    if len(species_data) > 0:
+        latest_price = species_data.iloc[-1]['평균가']
+
+        if len(species_data) > 1:
+            prev_price = species_data.iloc[-2]['평균가']
+            change_pct = ((latest_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
+            change_color = '#e74c3c' if change_pct > 0 else '#2ecc71' if change_pct < 0 else '#95a5a6'
+            change_symbol = '▲' if change_pct > 0 else '▼' if change_pct < 0 else '—'
+        else:
+            change_pct = 0
+            change_color = '#95a5a6'
+            change_symbol = '—'
+
+        ax.text(0.98, 0.98, f'{latest_price:,.0f}원', 
+            transform=ax.transAxes, fontsize=14, fontweight='bold',
+            verticalalignment='top', horizontalalignment='right',
+            bbox=dict(boxstyle='round,pad=0.6', facecolor='white', 
+                    edgecolor=color, linewidth=2.5, alpha=0.95))
+
+        ax.text(0.02, 0.98, f'{change_symbol} {abs(change_pct):.1f}%', 
+            transform=ax.transAxes, fontsize=11, fontweight='bold',
+            verticalalignment='top', horizontalalignment='left',
+            color=change_color,
+            bbox=dict(boxstyle='round,pad=0.5', facecolor='white', 
+                    edgecolor=change_color, linewidth=2, alpha=0.9))
+
+    fig.tight_layout()
+    return fig
 
-# ============================================================
-# 데이터 로딩
-# ============================================================
-@st.cache_data
-def load_data():
-    try:
-        df = pd.read_csv('data/수산물_통합전처리_3컬럼.csv')
-        price_cols = ['낙찰고가', '낙찰저가', '평균가']
-        for col in price_cols:
-            df[col] = df[col].astype(str).str.replace(',', '', regex=True)
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(0).astype(int)
-        df['date'] = pd.to_datetime(df['date'])
-        df['month'] = df['date'].dt.month
-        df['year'] = df['date'].dt.year
-        return df
-    except Exception as e:
-        st.error(f"데이터 로드 중 오류 발생: {e}")
-        return None
 
 # ============================================================
 # 메인 홈 화면
@@ -155,10 +177,11 @@ def run_home():
     st.markdown("---")
     st.markdown("<br>", unsafe_allow_html=True)
     
-    # 데이터 로드
-    df = load_data()
-    if df is None:
-        st.error("데이터를 불러올 수 없습니다.")
+    # 데이터 로드 (적재 시점에 미리 계산한 홈 화면 스냅샷 - 데이터 크기와 무관)
+    try:
+        snapshot = load_home_snapshot()
+    except Exception as e:
+        st.error(f"데이터를 불러올 수 없습니다: {e}")
         return
     
     # ============================================================
@@ -237,12 +260,9 @@ def run_home():
     </div>
     """, unsafe_allow_html=True)
     
-    # KPI 계산
-    today = df['date'].max()
-    today_data = df[df['date'] == today]
-    
-    total_species = df['파일어종'].nunique()
-    total_sources = df['산지'].nunique()
+    # KPI (home_snapshot 에서 미리 계산)
+    total_species = snapshot['total_species']
+    total_sources = snapshot['total_sources']
     
     # KPI 카드 2개 - 가로형 디자인
     col_space1, col1, col2, col_space2 = st.columns([0.5, 2, 2, 0.5])
@@ -309,70 +329,17 @@ def run_home():
     </div>
     """, unsafe_allow_html=True)
     
-    # 최근 7일간 거래량이 많은 어종 추출
-    recent_7days = df[df['date'] >= (today - pd.Timedelta(days=7))]
-    top_species = recent_7days['파일어종'].value_counts().head(6).index.tolist()
-    last_30days = df[df['date'] >= (today - pd.Timedelta(days=30))]
-    
+    # 최근 7일간 거래량이 많은 어종의 최근 30일 평균가 (home_snapshot 에서 미리 계산)
     # 2x3 그리드
     cols = st.columns(3)
     
-    for idx, species in enumerate(top_species):
-        species_data = last_30days[last_30days['파일어종'] == species].groupby('date')['평균가'].mean().reset_index()
-        
+    for idx, (species, species_data) in enumerate(snapshot['charts']):
         if len(species_data) > 0:
             col_idx = idx % 3
             
             with cols[col_idx]:
-                # 미니 차트 생성
-                fig, ax = plt.subplots(figsize=(4, 2.8))
-                
-                ax.plot(species_data['date'], species_data['평균가'], 
-                    color='#667eea', linewidth=3, marker='o', markersize=4)
-                ax.fill_between(species_data['date'], species_data['평균가'], 
-                            alpha=0.2, color='#667eea')
-                
-                ax.set_xlabel('')
-                ax.set_ylabel('')
-                ax.set_title(f'{species}', fontsize=15, fontweight='bold', 
-                           pad=12, color='#2c3e50')
-                ax.grid(True, alpha=0.3, linestyle='--', linewidth=0.8)
-                ax.tick_params(axis='x', rotation=45, labelsize=9)
-                ax.tick_params(axis='y', labelsize=10)
-                
-                ax.set_facecolor('#f8f9fa')
-                fig.patch.set_facecolor('white')
-                
-                # 최신 가격 표시
-                if len(species_data) > 0:
-                    latest_price = species_data.iloc[-1]['평균가']
-                    
-                    if len(species_data) > 1:
-                        prev_price = species_data.iloc[-2]['평균가']
-                        change_pct = ((latest_price - prev_price) / prev_price * 100) if prev_price > 0 else 0
-                        change_color = '#e74c3c' if change_pct > 0 else '#2ecc71' if change_pct < 0 else '#95a5a6'
-                        change_symbol = '▲' if change_pct > 0 else '▼' if change_pct < 0 else '—'
-                    else:
-                        change_pct = 0
-                        change_color = '#95a5a6'
-                        change_symbol = '—'
-                    
-                    ax.text(0.98, 0.98, f'{latest_price:,.0f}원', 
-                        transform=ax.transAxes, fontsize=14, fontweight='bold',
-                        verticalalignment='top', horizontalalignment='right',
-                        bbox=dict(boxstyle='round,pad=0.6', facecolor='white', 
-                                edgecolor='#667eea', linewidth=2.5, alpha=0.95))
-                    
-                    ax.text(0.02, 0.98, f'{change_symbol} {abs(change_pct):.1f}%', 
-                        transform=ax.transAxes, fontsize=11, fontweight='bold',
-                        verticalalignment='top', horizontalalignment='left',
-                        color=change_color,
-                        bbox=dict(boxstyle='round,pad=0.5', facecolor='white', 
-                                edgecolor=change_color, linewidth=2, alpha=0.9))
-                
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
+                # 미니 차트 (같은 데이터/스타일이면 캐시된 이미지 사용, matplotlib 미사용)
+                chart_cache.show('home_mini', species_data, _mini_chart, title=species, color=MINI_CHART_COLOR)
                 
                 st.markdown("<div style='margin-bottom: 25px;'></div>", unsafe_allow_html=True)
     
@@ -404,35 +371,15 @@ def run_home():
     """, unsafe_allow_html=True)
 
     # 월별 계산
-    today_dt = datetime.datetime.today()
-    this_month = today_dt.month
-    prev_month = 12 if this_month == 1 else this_month - 1
-    next_month = 1 if this_month == 12 else this_month + 1
-    target_months = [prev_month, this_month, next_month]
+    target_months = seasonal.target_months()
 
     months_korean = {
         1:'1월', 2:'2월', 3:'3월', 4:'4월', 5:'5월', 6:'6월',
         7:'7월', 8:'8월', 9:'9월', 10:'10월', 11:'11월', 12:'12월'
     }
 
-    # 어종별 최저가 기준 제철 판단
-    species_list = df['파일어종'].unique()
-    seasonal_data = []
-
-    for species in species_list:
-        species_df = df[df['파일어종'] == species]
-        monthly_avg = species_df.groupby('month').agg({'평균가': 'mean', 'date': 'count'}).reset_index()
-        monthly_avg.columns = ['month', 'avg_price', 'count']
-        monthly_avg = monthly_avg[monthly_avg['count'] >= 10]
-        if len(monthly_avg) > 0:
-            best_month = monthly_avg.loc[monthly_avg['avg_price'].idxmin()]
-            seasonal_data.append({
-                'species': species,
-                'best_month': int(best_month['month']),
-                'avg_price': int(best_month['avg_price'])
-            })
-
-    seasonal_df = pd.DataFrame(seasonal_data)
+    # 어종별 최저가 월 (home_snapshot 에서 미리 계산한 달 인덱스, 보여 줄 달만 여기서 조회)
+    seasonal_index = snapshot['seasonal']
 
     # 월별 추천 카드 표시
     cols = st.columns(3)
@@ -450,7 +397,7 @@ def run_home():
             </div>
             """, unsafe_allow_html=True)
 
-            month_species = seasonal_df[seasonal_df['best_month'] == month].sort_values('avg_price').head(6)
+            month_species = seasonal.month_picks(seasonal_index, month)
 
             if len(month_species) > 0:
                 for _, row in month_species.iterrows():
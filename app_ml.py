@@ -1,43 +1,27 @@
-import os
-import re
-import io
-import joblib
 import streamlit as st
-import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
 import pandas as pd
-from prophet import Prophet
-import seaborn as sns
-import plotly.express as px
 import plotly.graph_objects as go
-from koreanize_matplotlib import koreanize
-
-# ============================================================
-# 전역 설정(Global Settings)
-# ============================================================
-
-# 한글 폰트 설정 (OS 자동 인식)
-try:
-    font_path = "/System/Library/Fonts/AppleSDGothicNeo.ttc"  # macOS
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-except:
-    font_path = "C:/Windows/Fonts/malgun.ttf"  # Windows
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-rc('font', family=font_name)
-plt.rcParams['axes.unicode_minus'] = False
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['axes.titlesize'] = 13
-plt.rcParams['axes.labelsize'] = 11
-plt.rcParams['legend.fontsize'] = 10
-koreanize()  # 보조 폰트 지정
+
+import data_cube
+import forecast
+import jobs
+import model_registry
+from data_store import load_cube, forecast_for, species_list
 
 DATE_TICK_STEP = 3  # 날짜 라벨 표시 간격
 
-def _clean_price_series(s):
-    # 문자열로 된 가격에서 쉼표와 따옴표 제거 후 float 변환
-    if s.dtype == object:
-        return s.fillna('0').astype(str).str.replace(r"[^0-9.-]", "", regex=True).replace('', '0').astype(float)
-    return s.astype(float)
+
+def _train_forecast(report, species, engine):
+    """작업 큐에서 실행: 어종 하나 학습 (예측 테이블 캐시는 파일이 바뀌면 data_store 가 다시 읽음)
+
+    학습 데이터는 작업 시작 시점의 집계 큐브에서 다시 읽음 - 페이지가 들고 있던 큐브가 그 사이
+    다른 프로세스의 적재로 오래된 것이 됐어도 더 새 데이터로 학습된 모델을 덮어쓰지 않도록
+    """
+    report(0.1, f'{forecast.ENGINES[engine].label} 학습 중')
+    monthly = forecast.monthly_series(data_cube.load_cube('monthly'), species)
+    error = forecast.train_species(species, monthly, engine)
+    if error:
+        raise RuntimeError(error)
 
 
 def run_ml():
@@ -77,25 +61,13 @@ def run_ml():
     """, unsafe_allow_html=True)
     st.markdown('---')
 
-    data_path = os.path.join('data', '수산물_통합전처리_3컬럼.csv')
-    if not os.path.exists(data_path):
-        st.error(f'데이터 파일이 없습니다: {data_path}')
-        return
-
-    # 데이터 로드
-    df = pd.read_csv(data_path)
-
-    # 예상되는 컬럼 확인
-    needed = ['date', '파일어종', '평균가']
-    if not all(c in df.columns for c in needed):
-        st.error(f'데이터에 필요한 컬럼이 없습니다. 필요: {needed}. 현재 컬럼: {list(df.columns)}')
+    # 데이터 로드 (프로세스 공용, 읽기 전용 - 날짜/가격은 이미 정리되어 있음)
+    try:
+        load_cube('monthly')
+    except Exception as e:
+        st.error(f'데이터를 불러올 수 없습니다: {e}')
         return
 
-    # 전처리: 날짜 파싱, 평균가 정리
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df = df.dropna(subset=['date'])
-    df['평균가'] = _clean_price_series(df['평균가'])
-
     # 사이드바 설정
     with st.sidebar:
 
@@ -104,13 +76,20 @@ def run_ml():
         
         # 어종 선택
         st.markdown("## 어종 선택")
-        species_list = sorted(df['파일어종'].dropna().unique())
         species = st.selectbox(
             '분석할 어종을 선택하세요',
-            species_list,
+            species_list(),
             help="가격을 예측하고 싶은 어종을 선택하세요"
         )
         
+        st.markdown("## 예측 방식")
+        engine = st.radio(
+            '예측 엔진을 선택하세요',
+            list(forecast.ENGINES),
+            format_func=lambda name: forecast.ENGINES[name].label,
+            help="빠른 예측은 추세와 계절성만으로 즉시 계산합니다"
+        )
+
         st.markdown("## 기간 설정")
         years_to_forecast = st.slider(
             '예측 연도를 설정하세요',
@@ -145,22 +124,11 @@ def run_ml():
             - **장기 트렌드**: 연간 가격 추세를 파악하세요
             """)
 
-    # 모델 디렉터리
-    model_dir = os.path.join('.', 'models')
-    os.makedirs(model_dir, exist_ok=True)
-    model_file = os.path.join(model_dir, f'model_{re.sub(r"[^0-9a-zA-Z가-힣_]","_", species)}.pkl')
-
-    # 선택한 어종 데이터 월 단위 집계 (평균)
-    df_sp = df[df['파일어종'] == species].copy()
-    if df_sp.empty:
+    # 선택한 어종 데이터 월 단위 집계 (평균 - 월별 집계 큐브)
+    monthly = forecast.monthly_series(load_cube('monthly'), species)
+    if monthly.empty:
         st.warning('선택한 어종에 대한 데이터가 없습니다.')
         return
-        
-
-    df_sp.set_index('date', inplace=True)
-    monthly = df_sp['평균가'].resample('M').mean().reset_index()
-    monthly = monthly.dropna()
-    monthly = monthly.rename(columns={'date': 'ds', '평균가': 'y'})
 
 
     # 최근 시장 동향 표시 - 스타일 변경
@@ -185,25 +153,26 @@ def run_ml():
 
 
 
-    # 모델 로드 또는 학습
-    model = None
-    if os.path.exists(model_file):
-        try:
-            model = joblib.load(model_file)
-        except Exception as e:
-            model = None
-            st.warning('시스템을 초기화하고 있습니다. 잠시만 기다려주세요.')
-
-    if model is None:
-        with st.spinner('🔄 시장 데이터 분석 중...'):
-            model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False)
-            try:
-                model.fit(monthly)
-                joblib.dump(model, model_file)
-                st.success(' 데이터 분석이 완료되었습니다!')
-            except Exception as e:
-                st.error(' 분석 중 문제가 발생했습니다. 잠시 후 다시 시도해 주세요.')
+    # 예측 결과 (학습 시 5년치로 미리 계산한 예측 테이블에서 슬라이더 기간만 사용)
+    # 예측 테이블에 없거나 학습 데이터/라이브러리가 바뀐(레지스트리 기준) 어종만 다시 학습
+    is_current = model_registry.is_current(
+        forecast.model_key(species, engine), forecast.data_fingerprint(monthly, engine),
+        forecast.ENGINES[engine].libraries)
+    # 학습은 백그라운드 작업 큐에서 실행 (같은 엔진/어종 요청은 하나의 작업으로 합침)
+    job_key = f'forecast/{forecast.model_key(species, engine)}'
+    job = jobs.get(job_key)
+    if not is_current or forecast_for(species, months, engine).empty:
+        if job is not None and job.status == jobs.FAILED:
+            st.error(' 분석 중 문제가 발생했습니다. 잠시 후 다시 시도해 주세요.')
+            if not st.button('다시 시도', key='retry_forecast'):
                 return
+        job = jobs.submit(job_key, _train_forecast, species, engine,
+                          label=f'🔄 {species} 시장 데이터 분석')
+        jobs.progress_widget(job)
+        return
+    if job is not None and job.status == jobs.DONE and st.session_state.get('forecast_seen') is not job:
+        st.session_state['forecast_seen'] = job  # 완료 안내는 세션마다 1번만
+        st.success(' 데이터 분석이 완료되었습니다!')
 
     st.markdown('---')
 
@@ -218,12 +187,11 @@ def run_ml():
         </div>
     """, unsafe_allow_html=True)
 
-    # 가격 예측 수행
-    future = model.make_future_dataframe(periods=months, freq='M')
-    forecast = model.predict(future)
+    # 가격 예측 (미리 계산한 테이블에서 학습 구간 + 향후 months 개월)
+    forecast_df = forecast_for(species, months, engine)
 
     # 예측 데이터 준비
-    forecast_monthly = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
+    forecast_monthly = forecast_df[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].copy()
     forecast_monthly['ds'] = pd.to_datetime(forecast_monthly['ds']).dt.to_period('M').dt.to_timestamp()
 
     # 데이터 테이블 표시
@@ -251,7 +219,7 @@ def run_ml():
     """, unsafe_allow_html=True)
 
     # Plotly 인터랙티브 차트 생성
-    forecast_display = forecast.copy()
+    forecast_display = forecast_df.copy()
     forecast_display['ds'] = pd.to_datetime(forecast_display['ds'])
     
     # 실제 데이터와 예측 데이터 분리
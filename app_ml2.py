@@ -1,51 +1,100 @@
 import os
 import io
-import joblib
+import time
+import logging
 import streamlit as st
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 
+import jobs
+import model_registry
+import price_model
+from data_store import load_ai_table
 
-def _load_or_train_pipe(data_path, pipe_path):
-    if os.path.exists(pipe_path):
-        try:
-            pipe = joblib.load(pipe_path)
-            return pipe, 'loaded'
-        except Exception:
-            pass
-
-    from sklearn.ensemble import RandomForestRegressor
-    from sklearn.preprocessing import OneHotEncoder, MinMaxScaler
-    from sklearn.compose import ColumnTransformer
-    from sklearn.pipeline import Pipeline
-
-    df = pd.read_csv(data_path)
-    required = ['파일어종', '산지_그룹화', '규격_등급', '포장_분류', '수량', '중량', '평균가']
-    if not all(c in df.columns for c in required):
-        raise RuntimeError(f"데이터에 필요한 컬럼이 없습니다. 필요: {required}. 현재 컬럼: {list(df.columns)}")
-
-    X = df[['파일어종','산지_그룹화','규격_등급','포장_분류','수량','중량']].copy()
-    y = df['평균가'].astype(float)
-
-    ct = ColumnTransformer([
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False), ['파일어종','산지_그룹화','규격_등급','포장_분류']),
-        ('scaler', MinMaxScaler(), ['수량','중량'])
-    ], remainder='drop')
-    model = RandomForestRegressor(n_estimators=200, n_jobs=-1, random_state=42)
-    pipe = Pipeline(steps=[('pre', ct), ('model', model)])
-
-    sample = X.join(y).dropna()
-    if len(sample) > 20000:
-        sample = sample.sample(20000, random_state=42)
-    X_train = sample[['파일어종','산지_그룹화','규격_등급','포장_분류','수량','중량']]
-    y_train = sample['평균가']
-    pipe.fit(X_train, y_train)
+
+PIPE_KEY = price_model.PIPE_KEY  # 모델 레지스트리 키
+PIPE_LIBRARIES = price_model.PIPE_LIBRARIES
+
+logger = logging.getLogger(__name__)
+
+
+def _train_pipe(report, df, fingerprint, pipe_path):
+    # 작업 큐에서 실행: 파이프라인 학습 → 저장 + 레지스트리 기록
+    # 다른 프로세스가 같은 파이프라인을 학습 중이면 끝날 때까지 기다렸다가 그 결과를 사용
+    # 저장된 모델은 페이지가 _cached_pipe 로 읽으므로 작업 결과(jobs 에 보관)로는 돌려주지 않음
+    report(0.05, '다른 학습 완료 대기 중')
+    with model_registry.file_lock(pipe_path):
+        # 이미 저장돼 있으면 학습 생략 (기록은 있어도 파일을 읽을 수 없으면 다시 학습)
+        if price_model.load_pipe(fingerprint, pipe_path) is not None:
+            return None
+        return _fit_pipe(report, df, fingerprint, pipe_path)
+
+
+def _fit_pipe(report, df, fingerprint, pipe_path):
+    report(0.1, '학습 데이터 준비 중')
+    start = time.perf_counter()
+    pipe, X_train, y_train = price_model.fit_pipeline(df, report=report)
+    fit_seconds = time.perf_counter() - start
+    # 저장에 성공하면 None, 실패하면 학습한 모델을 반환해 이번 프로세스에서는 사용 (원인은 로그에 남김)
+    report(0.9, '모델 저장 중')
+    try:
+        model_registry.save_artifact(pipe, pipe_path)
+        metrics = model_registry.regression_metrics(y_train, pipe.predict(X_train))
+        model_registry.record({PIPE_KEY: model_registry.make_entry(
+            pipe_path, fingerprint, PIPE_LIBRARIES, fit_seconds, metrics)})
+    except Exception as e:
+        logger.exception('예측 모델 저장 실패: %s', pipe_path)
+        report(0.95, f'모델 저장 실패 - 이번 실행에서만 사용 ({type(e).__name__}: {e})')
+        return pipe
+    # 랜덤 포레스트면 예측 전용 압축 형식도 저장 (다음 로드부터 이 파일 사용, 실패해도 pickle 은 기록됨)
+    report(0.95, '압축 모델 저장 중')
     try:
-        joblib.dump(pipe, pipe_path)
+        price_model.save_compact(pipe, fingerprint)
     except Exception:
-        pass
-    return pipe, 'trained'
+        logger.exception('압축 예측 모델 저장 실패: %s', price_model.COMPACT_PATH)
+    return None
+
+
+def _build_lookup(report, pipe, df, fingerprint):
+    # 작업 큐에서 실행: 범주 조합 전체 × 수량/중량 격자 예측 조회표 생성
+    report(0.1, '예측 조회표 계산 중')
+    price_model.save_lookup(pipe, df, fingerprint)
+
+
+# 불러온 조회표/파이프라인은 데이터 지문별로 프로세스 공용 캐시에 보관 (위젯 조작마다
+# registry.json 을 읽고 파일을 역직렬화하지 않도록). 아직 없으면 LookupError 로 알려
+# 캐시하지 않음 → 학습/조회표 생성이 끝나면 다음 실행에서 다시 확인
+@st.cache_resource(show_spinner='예측 조회표를 불러오는 중...', max_entries=2)
+def _cached_lookup(fingerprint):
+    lookup = price_model.load_lookup(fingerprint)
+    if lookup is None:
+        raise LookupError(fingerprint)
+    return lookup
+
+
+@st.cache_resource(show_spinner='예측 모델을 불러오는 중...', max_entries=2)
+def _cached_pipe(fingerprint, pipe_path):
+    pipe = price_model.load_pipe(fingerprint, pipe_path)
+    if pipe is None:
+        raise LookupError(fingerprint)
+    return pipe
+
+
+# 데이터 지문은 불러온 가공 테이블당 한 번만 계산 (load_ai_table 도 경로별로 한 번만 읽음)
+# → 위젯 조작마다 전체 테이블을 다시 해시하지 않음
+@st.cache_resource(show_spinner=False)
+def _table_fingerprint(data_path):
+    return price_model.data_fingerprint(load_ai_table(data_path))
+
+
+def _load_model(fingerprint, pipe_path):
+    """최신 예측 조회표 → 파이프라인 순으로 캐시에서 찾음 (둘 다 없으면 None)"""
+    for loader, args in ((_cached_lookup, (fingerprint,)), (_cached_pipe, (fingerprint, pipe_path))):
+        try:
+            return loader(*args)
+        except LookupError:
+            continue
+    return None
 
 
 def run_ml2():
@@ -77,21 +126,45 @@ def run_ml2():
         unsafe_allow_html=True,
     )
 
-    data_path = os.path.join('data', 'ai데이터가공.csv')
-    pipe_path = os.path.join('.', 'pipe.pkl')
+    data_path = price_model.AI_DATA_PATH
+    pipe_path = price_model.PIPE_PATH
 
     if not os.path.exists(data_path):
         st.error(f'데이터 파일이 없습니다: {data_path}')
         return
 
-    df = pd.read_csv(data_path, usecols=['파일어종','산지_그룹화','규격_등급','포장_분류','수량','중량','평균가'])
+    # 데이터 로드 (프로세스 공용, 읽기 전용)
+    df = load_ai_table(data_path)
 
-    with st.spinner('모델 준비 중... (있으면 로드, 없으면 학습)'):
-        try:
-            pipe, status = _load_or_train_pipe(data_path, pipe_path)
-        except Exception as e:
-            st.error(f'모델 준비 실패: {e}')
+    # 최신 예측 조회표가 있으면 랜덤 포레스트를 불러오지 않고 조회표로 응답
+    # 없으면 파이프라인으로 예측하면서 조회표 생성을 작업 큐에 등록
+    # 저장된 모델이 없거나 오래됐으면 백그라운드 작업 큐에서 학습
+    # 작업 키에 데이터 지문을 넣어 같은 데이터의 학습 요청만 합침
+    fingerprint = _table_fingerprint(data_path)
+    job_key = f'{PIPE_KEY}/{fingerprint}'
+    pipe = _load_model(fingerprint, pipe_path)
+    if pipe is None:
+        job = jobs.get(job_key)
+        if job is not None and job.status == jobs.DONE and job.result is not None:
+            pipe = job.result  # 저장에 실패했을 때만 남는 방금 학습한 모델
+        else:
+            if job is not None and job.status == jobs.FAILED:
+                st.error(f'모델 준비 실패: {job.error}')
+                if not st.button('다시 시도', key='retry_pipe'):
+                    return
+            job = jobs.submit(job_key, _train_pipe, df, fingerprint, pipe_path, label='예측 모델 학습')
+            jobs.progress_widget(job)
             return
+    if not isinstance(pipe, price_model.PriceLookup):
+        # 조회표 생성은 데이터 지문당 한 번 (실패하면 파이프라인으로 예측하고, 버튼으로만 다시 시도)
+        lookup_key = f'{price_model.LOOKUP_KEY}/{fingerprint}'
+        lookup_job = jobs.get(lookup_key)
+        retry = False
+        if lookup_job is not None and lookup_job.status == jobs.FAILED:
+            st.warning(f'예측 조회표 생성 실패 (모델로 직접 예측합니다): {lookup_job.error}')
+            retry = st.button('조회표 다시 만들기', key='retry_lookup')
+        if lookup_job is None or retry:
+            jobs.submit(lookup_key, _build_lookup, pipe, df, fingerprint, label='예측 조회표 생성')
 
     files = sorted(df['파일어종'].dropna().unique())
     areas = sorted(df['산지_그룹화'].dropna().unique())
@@ -188,19 +261,19 @@ def run_ml2():
                 '중량': float(weight)
             }])
             try:
-                pred = pipe.predict(Xnew)[0]
-                model = None
-                try:
-                    model = pipe.named_steps.get(list(pipe.named_steps.keys())[-1])
-                except Exception:
-                    model = None
-                lower, median, upper = (None, pred, None)
-                if model is not None and hasattr(model, 'estimators_'):
-                    preds = np.array([est.predict(pipe.named_steps['pre'].transform(Xnew))
-                                      for est in model.estimators_])
-                    lower = np.percentile(preds, 5)
-                    median = np.percentile(preds, 50)
-                    upper = np.percentile(preds, 95)
+                # 입력은 한 번만 전처리하고 전체 트리 예측을 한 번에 계산 (price_model 참고)
+                pred, lower, median, upper = price_model.predict_interval(pipe, Xnew)
+                pred, median = pred[0], median[0]
+                interval_html = ''
+                if lower is not None:  # 구간을 주지 않는 모델이면 구간 표시 생략
+                    lower, upper = lower[0], upper[0]
+                    interval_html = f"""
+                        <div style='background: #f8f9fa; padding: 12px; border-radius: 8px; margin-top: 15px;'>
+                            <div style='color: #666; font-size: 14px;'>예측 신뢰 구간 (5% ~ 95%)</div>
+                            <div style='color: #1e3d59; font-size: 16px; font-weight: 500; margin-top: 5px;'>
+                                {lower:,.0f}원 ~ {upper:,.0f}원
+                            </div>
+                        </div>"""
                 st.markdown(f"""
                     <div style='background: linear-gradient(135deg, #1e3c72 0%, #2a5298 100%);
                                 padding: 15px; border-radius: 10px; color: white; margin: 20px 0;'>
@@ -211,13 +284,7 @@ def run_ml2():
                         <h2 style='color: #1e3d59; margin: 0 0 10px 0;'>{sel_file}</h2>
                         <div style='font-size: 32px; font-weight: 700; color: #2a5298; margin: 15px 0;'>
                             {pred:,.0f}원
-                        </div>
-                        <div style='background: #f8f9fa; padding: 12px; border-radius: 8px; margin-top: 15px;'>
-                            <div style='color: #666; font-size: 14px;'>예측 신뢰 구간 (5% ~ 95%)</div>
-                            <div style='color: #1e3d59; font-size: 16px; font-weight: 500; margin-top: 5px;'>
-                                {lower:,.0f}원 ~ {upper:,.0f}원
-                            </div>
-                        </div>
+                        </div>{interval_html}
                     </div>
                 """, unsafe_allow_html=True)
 
@@ -240,31 +307,53 @@ def run_ml2():
 
         st.markdown('---')
 
+        # 구매 목록 일괄 예측 (CSV 업로드 → 전체 행을 한 번에 예측 → CSV 다운로드)
+        st.subheader('구매 목록 일괄 예측')
+        info_banner("💡 거래 조건 목록 CSV를 올리면 모든 행의 예측 가격을 한 번에 계산합니다.")
+
+        template = pd.DataFrame([{
+            '파일어종': sel_file, '산지_그룹화': sel_area, '규격_등급': sel_size,
+            '포장_분류': sel_pack, '수량': float(qty), '중량': float(weight)
+        }], columns=price_model.FEATURE_COLUMNS)
+        st.download_button(
+            label='📄 입력 양식 다운로드 (CSV)',
+            data=template.to_csv(index=False).encode('utf-8-sig'),
+            file_name='구매목록_양식.csv',
+            mime='text/csv'
+        )
+        uploaded = st.file_uploader('구매 목록 CSV 업로드', type=['csv'],
+                                    help=f"필요한 컬럼: {', '.join(price_model.FEATURE_COLUMNS)}")
+        if uploaded is not None:
+            try:
+                orders = pd.read_csv(uploaded, encoding='utf-8-sig')
+                with st.spinner(f'{len(orders):,}건 예측 중...'):
+                    scored = price_model.predict_batch(pipe, orders)
+            except Exception as e:
+                st.error(f'일괄 예측 실패: {e}')
+            else:
+                failed = int(scored['예측가격'].isna().sum())
+                st.success(f'{len(scored) - failed:,}건 예측 완료'
+                           + (f' (입력값이 비었거나 숫자가 아닌 {failed:,}건 제외)' if failed else ''))
+                st.dataframe(scored.head(100), hide_index=True)
+                st.download_button(
+                    label='📥 일괄 예측 결과 다운로드 (CSV)',
+                    data=scored.to_csv(index=False).encode('utf-8-sig'),
+                    file_name='구매목록_예측결과.csv',
+                    mime='text/csv'
+                )
+
+        st.markdown('---')
+
         # AI 분석 정보 부분도 동일 스타일로
         info_banner("💡 AI 모델이 학습한 가격 영향 요인을 확인하세요.")
 
         try:
-            last_key = list(pipe.named_steps.keys())[-1]
-            model = pipe.named_steps[last_key]
-            if hasattr(model, 'feature_importances_'):
-                fi = model.feature_importances_
-                feat_names = None
-                try:
-                    pre = pipe.named_steps.get('pre')
-                    if pre and hasattr(pre, 'named_transformers_'):
-                        ohe = pre.named_transformers_.get('onehot')
-                        if ohe and hasattr(ohe, 'categories_'):
-                            cat_names = []
-                            cols = ['파일어종','산지_그룹화','규격_등급','포장_분류']
-                            for i, cats in enumerate(ohe.categories_):
-                                for c in cats:
-                                    cat_names.append(f"{cols[i]}={c}")
-                            feat_names = cat_names + ['수량','중량']
-                except Exception:
-                    feat_names = None
-                if feat_names is None or len(feat_names) != len(fi):
-                    feat_names = [f'factor_{i}' for i in range(len(fi))]
-                fi_series = pd.Series(fi, index=feat_names).sort_values(ascending=False).head(10)
+            if isinstance(pipe, price_model.PriceLookup):
+                importances = pipe.importances
+            else:
+                importances = price_model.feature_importances(pipe)
+            if importances is not None:
+                fi_series = importances.head(10)
                 fig, ax = plt.subplots(figsize=(6,4))
                 bars = fi_series.plot(kind='barh', ax=ax,
                                     color='#4facfe',
@@ -1,9 +1,8 @@
 #-------------------------------------------------------
 import streamlit as st
-import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
-from koreanize_matplotlib import koreanize
+
+from data_store import by_market, market_list, rollup
 
 
 
@@ -100,63 +99,27 @@ def source_price():
 
     st.markdown("---")
 
-# ============================================================
-# 전역 설정(Global Settings)
-# ============================================================
-
-# 한글 폰트 설정 (OS 자동 인식)
-try:
-    font_path = "/System/Library/Fonts/AppleSDGothicNeo.ttc"  # macOS
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-except:
-    font_path = "C:/Windows/Fonts/malgun.ttf"  # Windows
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-rc('font', family=font_name)
-plt.rcParams['axes.unicode_minus'] = False
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['axes.titlesize'] = 13
-plt.rcParams['axes.labelsize'] = 11
-plt.rcParams['legend.fontsize'] = 10
-koreanize()  # 보조 폰트 지정
-
 DATE_TICK_STEP = 3  # 날짜 라벨 표시 간격
 
 
 
-# ============================================================
-# 데이터 로딩 및 전처리 함수
-# ============================================================
-@st.cache_data # 캐싱 데코레이터
-
-
-def load_data():
-
-    try:
-        df = pd.read_csv('data/수산물_통합전처리_3컬럼.csv')
-        
-        # 문자열 → 숫자 변환 및 반올림(정수)
-        price_cols = ['낙찰고가', '낙찰저가', '평균가']
-        for col in price_cols:
-            df[col] = df[col].astype(str).str.replace(',', '', regex=True)
-            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(0).astype(int)
+STAT_LABELS = {'mean': '평균 경매가', 'median': '경매가 중앙값', 'count': '거래 건수'}
 
 
-        # 날짜 처리
-        df['date'] = pd.to_datetime(df['date'])
-        df['month'] = df['date'].dt.month
-        df['year'] = df['date'].dt.year
-        
-        return df
-    except Exception as e:
-        st.error(f"데이터 로드 중 오류 발생: {e}")
-        return None
 
-# 데이터 로드
-df = load_data()
+def market_species_stats(market, stat='mean', by_pre=False):
+    """산지 하나의 어종별(by_pre 면 어종 × 전처리) 평균가 평균/중앙값 또는 거래 건수
 
-if df is None:
-    st.error("데이터를 불러올 수 없습니다. 파일 경로를 확인해주세요.")
-    st.stop()
+    거래 행을 어종 단위로 먼저 묶어 막대 수 = 어종 수 (값이 큰 어종부터)
+    평균/건수는 집계 큐브, 중앙값은 큐브로 다시 묶을 수 없어 산지 거래 행을 한 번 groupby
+    """
+    by = ['파일어종', '전처리'] if by_pre else ['파일어종']
+    if stat == 'median':
+        values = by_market(market).groupby(by)['평균가'].median()
+    else:
+        values = rollup('monthly', by, 산지=market).set_index(by)['평균가' if stat == 'mean' else 'count']
+    table = values.unstack('전처리') if by_pre else values.to_frame(STAT_LABELS[stat])
+    return table.loc[table.sum(axis=1).sort_values(ascending=False, kind='stable').index]
 
 
 def filter_by_species(df, species_col, species_name, min_count=100):
@@ -198,27 +161,32 @@ def source():
 
 
     # 셀렉트박스 - (원양) 포함 산지를 맨 밑으로
-    산지_목록_전체 = df['산지'].unique()
-    산지_일반 = sorted([x for x in 산지_목록_전체 if '(원양)' not in str(x)])  #  (원양) 제외하고 정렬
-    산지_원양 = sorted([x for x in 산지_목록_전체 if '(원양)' in str(x)])      #  (원양) 포함 정렬
-    산지_목록 = 산지_일반 + 산지_원양  #  일반 산지 + 원양 산지 순서로 결합
+    산지_목록 = market_list()  #  일반 산지 + 원양 산지 순서로 결합
 
     선택_산지_1 = st.selectbox('산지를 선택하세요', 산지_목록)
 
+    col_stat, col_pre = st.columns(2)
+    with col_stat:
+        집계_기준 = st.radio('집계 기준', list(STAT_LABELS), format_func=STAT_LABELS.get,
+                          horizontal=True, key='산지1_집계')
+    with col_pre:
+        전처리별 = st.checkbox('전처리(활/선/냉)별로 나눠 보기', key='산지1_전처리')
 
-    # 시각화 
+
+    # 시각화 (어종별로 묶은 뒤 그림 - 막대 수는 거래 건수가 아니라 어종 수)
     if 선택_산지_1:
-            filtered_df = df[df['산지'] == 선택_산지_1]
+            table = market_species_stats(선택_산지_1, 집계_기준, 전처리별)
 
-            if not filtered_df.empty:
+            if not table.empty:
                 fig, ax = plt.subplots(figsize=(10, 6))
-                ax.bar(filtered_df['파일어종'], filtered_df['평균가'])
+                table.plot.bar(ax=ax, width=0.8, legend=전처리별)
                 ax.set_xlabel('어종')
-                ax.set_ylabel('평균 경매가')
-                ax.set_title(f'{선택_산지_1} 산지 어종별 평균 경매가', fontsize=14)
+                ax.set_ylabel(STAT_LABELS[집계_기준])
+                ax.set_title(f'{선택_산지_1} 산지 어종별 {STAT_LABELS[집계_기준]}', fontsize=14)
                 plt.xticks(rotation=45, ha='right')
                 plt.tight_layout()
                 st.pyplot(fig)
+                plt.close(fig)
             else:
                 st.info("선택한 산지에 해당하는 데이터가 없습니다.")
 
@@ -242,13 +210,11 @@ def source_species():
     </div>
     """, unsafe_allow_html=True)
 
-    품종_목록 = sorted(df['어종'].unique())
-
     st.markdown('---')
 
     #  거래량 계산 (데이터 개수 또는 평균가 합계로 판단)
-    #  데이터 개수 기준
-    품종별_거래량 = df.groupby('어종').size().reset_index(name='거래량')
+    #  데이터 개수 기준 (집계 큐브의 거래 건수 사용)
+    품종별_거래량 = rollup('monthly', ['어종']).rename(columns={'count': '거래량'})
     상위_품종 = 품종별_거래량.nlargest(10, '거래량')['어종'].tolist()
 
     품종_목록 = sorted(상위_품종)
@@ -261,9 +227,7 @@ def source_species():
 
     with col2:
         # 선택한 품종에서 거래량이 가장 많은 산지만 필터링
-        품종_데이터 = df[df['어종'] == 선택_품종]
-        
-        산지별_거래량 = 품종_데이터.groupby('산지').size().reset_index(name='거래량')
+        산지별_거래량 = rollup('monthly', ['산지'], 어종=선택_품종).rename(columns={'count': '거래량'})
         상위_산지 = 산지별_거래량.nlargest(5, '거래량')['산지'].tolist()
     
         # (원양) 분리 및 정렬
@@ -279,12 +243,13 @@ def source_species():
 
 
 
-    # 필터링
-    filtered_df_2 = df[(df['산지'] == 선택_산지_2) & (df['어종'] == 선택_품종)]
+    # 필터링 (산지·품종별 월 평균 - 집계 큐브)
+    monthly_avg = rollup('monthly', ['month'], 산지=선택_산지_2, 어종=선택_품종)
+    거래_건수 = int(monthly_avg['count'].sum())
+    monthly_avg = monthly_avg[['month', '평균가']]
 
     # 시각화 
-    if len(filtered_df_2) > 0:
-        monthly_avg = filtered_df_2.groupby('month')['평균가'].mean().reset_index()
+    if 거래_건수 > 0:
 
         # ⭐ 인사이트 계산 
         최고가_월 = monthly_avg.loc[monthly_avg['평균가'].idxmax(), 'month']
@@ -317,7 +282,7 @@ def source_species():
         with col_b:
             st.metric("최대 가격차", f"{가격차이:,.0f}원", f"{변동률:.1f}%")
         with col_c:
-            st.metric("거래 건수", f"{len(filtered_df_2):,}건")
+            st.metric("거래 건수", f"{거래_건수:,}건")
 
     else:
         st.warning("날짜 컬럼이 없거나 데이터가 유효하지 않아 월별 그래프를 그릴 수 없습니다.")
@@ -4,35 +4,21 @@
 # 작성 목적:
 #   - 어종별 경매가 변동 추이, 파일어종별 비교, 해양데이터 연계 시각화 제공
 # 개발 언어:
-#   - Python (pandas, matplotlib, streamlit)
+#   - Python (pandas, matplotlib, plotly, streamlit)
 # ============================================================
 
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from matplotlib import font_manager, rc
-from koreanize_matplotlib import koreanize  # 한글 폰트 깨짐 방지
+from matplotlib.colors import to_hex
+import plotly.graph_objects as go
 
-# ============================================================
-# 전역 설정(Global Settings)
-# ============================================================
-
-# 한글 폰트 설정 (OS 자동 인식)
-try:
-    font_path = "/System/Library/Fonts/AppleSDGothicNeo.ttc"  # macOS
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-except:
-    font_path = "C:/Windows/Fonts/malgun.ttf"  # Windows
-    font_name = font_manager.FontProperties(fname=font_path).get_name()
-rc('font', family=font_name)
-plt.rcParams['axes.unicode_minus'] = False
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams['axes.titlesize'] = 13
-plt.rcParams['axes.labelsize'] = 11
-plt.rcParams['legend.fontsize'] = 10
-koreanize()  # 보조 폰트 지정
+import downsample
+from data_cube import rollup
+from data_store import load_cube
 
 DATE_TICK_STEP = 3  # 날짜 라벨 표시 간격
+PIXEL_BUDGET = 800  # 인터랙티브 차트에서 선 하나에 그릴 최대 점 수 (차트 가로 픽셀 수준)
 
 
 # ============================================================
@@ -48,31 +34,12 @@ def extract_state_and_species(species_name):
         return match.group(1), match.group(2)  # 상태, 품종
     return '', species_name  # 상태 구분이 없는 경우
 
-def load_and_preprocess_data(path):
-    """CSV 파일 로딩 및 전처리"""
-    df = pd.read_csv(path)
-
-    # 문자열 → 숫자 변환 및 반올림(정수)
-    price_cols = ['낙찰고가', '낙찰저가', '평균가']
-    for col in price_cols:
-        df[col] = df[col].astype(str).str.replace(',', '', regex=True)
-        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(0).astype(int)
-
-    # 날짜 처리
-    df['date'] = pd.to_datetime(df['date'], errors='coerce')
-    df.dropna(subset=['date'], inplace=True)
-    df['year'] = df['date'].dt.year
-    df['month'] = df['date'].dt.month
-
-    return df
-
-
-def filter_by_species(df, species_col, species_name, min_count=100):
-    """특정 어종 기준 필터링 후 평균가 계산 (정수 변환)"""
-    filtered = df[df[species_col] == species_name]
-    if len(filtered) <= min_count:
+def filter_by_species(cube, species_col, species_name, min_count=100):
+    """특정 어종 기준 날짜별 평균가 계산 (일별 집계 큐브 사용, 정수 변환)"""
+    daily = rollup(cube, ['date'], **{species_col: species_name})
+    if daily['count'].sum() <= min_count:
         return None
-    grouped = filtered.groupby('date')[['낙찰고가', '낙찰저가', '평균가']].mean().round(0).astype(int)
+    grouped = daily.set_index('date')[['낙찰고가', '낙찰저가', '평균가']].round(0).astype(int)
     return grouped
 
 
@@ -80,8 +47,15 @@ def filter_by_species(df, species_col, species_name, min_count=100):
 # 가격 시각화 함수
 # ============================================================
 
-def plot_metrics(dfs, metrics, titles, step=DATE_TICK_STEP):
-    """날짜별 가격 변화를 선 그래프로 시각화 (여러 데이터프레임 비교)"""
+METRIC_COLORS = {'평균가': ['tab:blue', 'tab:red'], '낙찰고가': ['tab:orange', 'darkred'], '낙찰저가': ['tab:green', 'darkgreen']}
+
+
+def plot_metrics(dfs, metrics, titles, step=DATE_TICK_STEP, key='metrics'):
+    """날짜별 가격 변화를 선 그래프로 시각화 (여러 데이터프레임 비교)
+
+    기본은 인터랙티브(WebGL) 차트, 토글을 끄면 기존 matplotlib 차트
+    key: 같은 화면에 여러 번 호출할 때 위젯 구분용
+    """
     if not isinstance(dfs, list):
         dfs = [dfs]
         titles = [titles]
@@ -90,12 +64,18 @@ def plot_metrics(dfs, metrics, titles, step=DATE_TICK_STEP):
         st.warning("시각화할 데이터가 없습니다.")
         return
 
+    if st.toggle('인터랙티브 차트 (확대/이동)', value=True, key=f'{key}_interactive'):
+        plot_metrics_interactive(dfs, metrics, titles, key=key)
+        return
+
     fig, ax = plt.subplots(figsize=(12, 6))
-    colors = {'평균가': ['tab:blue', 'tab:red'], '낙찰고가': ['tab:orange', 'darkred'], '낙찰저가': ['tab:green', 'darkgreen']}
+    colors = METRIC_COLORS
     line_styles = ['-', '--']  # 서로 다른 품종을 구분하기 위한 선 스타일
 
-    # 모든 데이터프레임의 날짜 범위를 통합
-    all_dates = sorted(set().union(*[df.index for df in dfs]))
+    # 모든 데이터프레임의 날짜 범위를 통합 (정렬된 DatetimeIndex 합집합)
+    all_dates = dfs[0].index
+    for df in dfs[1:]:
+        all_dates = all_dates.union(df.index)
     
     for df_idx, (df, title) in enumerate(zip(dfs, titles)):
         for metric in metrics:
@@ -119,25 +99,71 @@ def plot_metrics(dfs, metrics, titles, step=DATE_TICK_STEP):
 
     plt.tight_layout()
     st.pyplot(fig)
+    plt.close(fig)
+
+
+def plot_metrics_interactive(dfs, metrics, titles, budget=PIXEL_BUDGET, key='metrics'):
+    """plot_metrics 의 Plotly WebGL(Scattergl) 버전
+
+    선마다 표시 기간 안의 점을 LTTB 로 budget 개 이하로 줄여 전송
+    표시 기간 슬라이더를 좁히면 그 구간만 원본 해상도로 다시 계산 (budget 이하가 되면 전체 점)
+    """
+    start = min(df.index.min() for df in dfs).date()
+    end = max(df.index.max() for df in dfs).date()
+    if start < end:
+        lo, hi = st.slider('표시 기간', min_value=start, max_value=end, value=(start, end),
+                           format='YYYY-MM-DD', key=f'{key}_window')
+    else:
+        lo, hi = start, end
+    lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+
+    fig = go.Figure()
+    line_dashes = ['solid', 'dash']  # 서로 다른 품종을 구분하기 위한 선 스타일
+    shown, total = 0, 0
+    for df_idx, (df, title) in enumerate(zip(dfs, titles)):
+        window = df.loc[lo:hi]
+        for metric in metrics:
+            if metric not in window.columns:
+                continue
+            series = downsample.lttb(window[metric], budget)
+            full = len(series) == len(window)
+            shown, total = shown + len(series), total + len(window)
+            fig.add_trace(go.Scattergl(
+                x=series.index, y=series.to_numpy(),
+                mode='lines+markers' if full else 'lines',
+                name=f"{title} - {metric}",
+                line=dict(color=to_hex(METRIC_COLORS[metric][df_idx % len(METRIC_COLORS[metric])]),
+                          dash=line_dashes[df_idx % len(line_dashes)], width=2),
+                marker=dict(symbol='circle' if df_idx == 0 else 'square', size=5),
+                hovertemplate='%{x|%Y-%m-%d}<br>%{y:,.0f}원<extra></extra>',
+            ))
+
+    fig.update_layout(
+        title="품종별 가격 비교" if len(dfs) > 1 else titles[0],
+        xaxis_title='날짜', yaxis_title='가격 (원)',
+        hovermode='x unified', height=500,
+        legend=dict(orientation='h', yanchor='bottom', y=1.02, xanchor='right', x=1),
+    )
+    fig.update_xaxes(tickformat='%Y-%m')
+    st.plotly_chart(fig, width='stretch')
+    if shown < total:
+        st.caption(f'표시 기간 거래일 {total:,}개 점 중 {shown:,}개 표시 (LTTB 축소) · '
+                   f'표시 기간을 좁히면 해당 구간을 원본 해상도로 다시 그립니다.')
 
 
 # ============================================================
 # 해양데이터 연계 시각화 함수
 # ============================================================
 
-def calculate_species_correlations(df, ocean_df, market):
-    """모든 어종에 대한 환경 변수와의 상관관계 계산"""
+def calculate_species_correlations(cube, ocean_df, market):
+    """모든 어종에 대한 환경 변수와의 상관관계 계산 (집계 큐브 사용)"""
     correlations = {}
     ocean_selected = ocean_df[ocean_df['산지'] == market]
+    monthly_all = rollup(cube, ['파일어종', 'year', 'month'])
+    monthly_all['평균가'] = monthly_all['평균가'].round(0)
     
-    for species in df['파일어종'].unique():
-        species_monthly = (
-            df[df['파일어종'] == species]
-            .groupby(['year', 'month'])[['평균가']]
-            .mean()
-            .round(0)
-            .reset_index()
-        )
+    for species, species_monthly in monthly_all.groupby('파일어종', sort=False):
+        species_monthly = species_monthly[['year', 'month', '평균가']]
         
         merged = pd.merge(species_monthly, ocean_selected[['year', 'month', '기온 평균', '수온 평균', '풍속 평균']], 
                          on=['year', 'month'], how='inner')
@@ -309,8 +335,8 @@ def species_price():
 
 
 
-    # 1️⃣ CSV 데이터 로드 및 전처리
-    df = load_and_preprocess_data('./data/수산물_통합전처리_3컬럼.csv')
+    # 1️⃣ 데이터 로드 (일별 집계 큐브 - 원본 행 수와 무관)
+    df = load_cube('daily')
 
     # 2️⃣ 세션 상태 초기화
     for key in ['section1_show', 'section2_show', 'section3_show']:
@@ -360,7 +386,7 @@ def species_price():
             if selected_metrics is None or len(selected_metrics) == 0:
                 st.warning("하나 이상의 가격 항목을 선택해주세요.")
             else:
-                plot_metrics(result, selected_metrics, f"{species} 가격 추이")
+                plot_metrics(result, selected_metrics, f"{species} 가격 추이", key='section1_metrics')
                 # ==================== 메트릭 카드 섹션 ====================
                 st.markdown("---")
                 
@@ -527,7 +553,7 @@ def species_price():
     st.markdown("---")
     
     file_species = st.selectbox(
-        "어종을 선택하세요 .", sorted(df.groupby('파일어종').size()[lambda x: x > 100].index))
+        "어종을 선택하세요 .", sorted(df.groupby('파일어종')['count'].sum()[lambda x: x > 100].index))
     
     col3, col4 = st.columns(2)
     with col3:
@@ -548,7 +574,7 @@ def species_price():
             state, pure_species = extract_state_and_species(species_name)
             if state:  # 상태 정보가 있는 경우
                 # 해당 상태와 품종의 데이터 수 확인
-                species_count = len(subset[subset['어종'] == species_name])
+                species_count = subset.loc[subset['어종'] == species_name, 'count'].sum()
                 if species_count >= 100:  # 데이터가 100개 이상인 경우만 저장
                     if pure_species not in species_info:
                         species_info[pure_species] = set()
@@ -640,7 +666,7 @@ def species_price():
                 else:
                     metrics_to_plot = ['평균가', '낙찰고가', '낙찰저가']
 
-                plot_metrics(results, metrics_to_plot, species_list)
+                plot_metrics(results, metrics_to_plot, species_list, key='section2_metrics')
 
             st.markdown("---")
 
@@ -863,13 +889,8 @@ def species_price():
                 label_visibility="collapsed",
             )
 
-        species_monthly = (
-            df[df['파일어종'] == selected_file_species]
-            .groupby(['year', 'month'])[['평균가']]
-            .mean()
-            .round(0)
-            .reset_index()
-        )
+        species_monthly = rollup(df, ['year', 'month'], 파일어종=selected_file_species)[['year', 'month', '평균가']]
+        species_monthly['평균가'] = species_monthly['평균가'].round(0)
 
 
         ocean_cols = ['기온 평균', '수온 평균', '풍속 평균']
@@ -1119,9 +1140,6 @@ def show_source():
     st.markdown("---")
     st.caption("📍 데이터 출처: 수산물유통정보시스템(FIPS) | 해양환경정보시스템")
 
-# 앱 마지막에 호출
-show_source()
-
 
 # ============================================================
 # 실행부
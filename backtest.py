@@ -0,0 +1,166 @@
+# ============================================================
+# 🧪 예측 엔진 롤링 오리진 백테스트
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 날짜별 예측(app_ml)의 엔진 선택을 정확도/지연 수치로 판단
+#   - 파일어종별로 학습 구간 끝(기준월)을 step 개월씩 옮겨 가며
+#     그 이후 horizon 개월을 예측하고 실제 월 평균가와 비교
+#   - (엔진, 어종) 단위 작업을 프로세스 풀로 병렬 실행
+# 출력:
+#   엔진 × 어종별 MAPE / RMSE / 구간 적중률 / 평균 학습·예측 시간, 엔진별 평균
+# 실행:
+#   python backtest.py                                 # 전체 엔진 × 전체 파일어종
+#   python backtest.py --engines seasonal --horizon 6
+#   python backtest.py --csv backtest.csv              # 결과 CSV 저장
+# ============================================================
+
+import os
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+import data_cube
+import data_ingest
+import forecast
+
+
+INITIAL = 24  # 첫 기준월까지 최소 학습 개월 수
+HORIZON = 12  # 기준월마다 예측해 평가할 개월 수
+STEP = 3      # 기준월 이동 간격 (개월)
+
+RESULT_COLUMNS = ['engine', '파일어종', 'origins', 'MAPE', 'RMSE', 'coverage', 'fit_ms', 'predict_ms', 'error']
+
+
+def origins(n, initial=INITIAL, horizon=HORIZON, step=STEP):
+    """학습 구간 길이(기준월 위치) 목록: 마지막 기준월은 horizon 개월이 모두 남도록"""
+    return list(range(initial, n - horizon + 1, step))
+
+
+def backtest_series(engine, series, initial=INITIAL, horizon=HORIZON, step=STEP):
+    """어종 하나의 롤링 오리진 평가 → 지표 dict"""
+    engine = forecast.ENGINES[engine]
+    actual, pred, lower, upper = [], [], [], []
+    fit_times, predict_times = [], []
+    cutoffs = origins(len(series), initial, horizon, step)
+    for cutoff in cutoffs:
+        train = series.iloc[:cutoff].reset_index(drop=True)
+        test = series.iloc[cutoff:cutoff + horizon]
+
+        start = time.perf_counter()
+        model = engine.fit(train)
+        fit_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        table = engine.predict(model, horizon)
+        predict_times.append(time.perf_counter() - start)
+
+        future = table[table['step'] > 0].set_index('ds').reindex(test['ds'])
+        actual.append(test['y'].to_numpy(dtype='float64'))
+        pred.append(future['yhat'].to_numpy(dtype='float64'))
+        lower.append(future['yhat_lower'].to_numpy(dtype='float64'))
+        upper.append(future['yhat_upper'].to_numpy(dtype='float64'))
+
+    if not cutoffs:
+        return {'origins': 0, 'MAPE': np.nan, 'RMSE': np.nan, 'coverage': np.nan,
+                'fit_ms': np.nan, 'predict_ms': np.nan}
+    actual, pred = np.concatenate(actual), np.concatenate(pred)
+    lower, upper = np.concatenate(lower), np.concatenate(upper)
+    err = actual - pred
+    nonzero = actual != 0
+    return {
+        'origins': len(cutoffs),
+        'MAPE': float(np.nanmean(np.abs(err[nonzero] / actual[nonzero])) * 100),
+        'RMSE': float(np.sqrt(np.nanmean(err ** 2))),
+        'coverage': float(np.nanmean((actual >= lower) & (actual <= upper)) * 100),
+        'fit_ms': float(np.mean(fit_times) * 1000),
+        'predict_ms': float(np.mean(predict_times) * 1000),
+    }
+
+
+def _run_task(task):
+    """워커: (엔진, 어종) 하나 평가 → 결과 행 dict"""
+    engine, species, series, initial, horizon, step = task
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    row = {'engine': engine, '파일어종': species, 'error': None}
+    try:
+        row.update(backtest_series(engine, series, initial, horizon, step))
+    except Exception as e:
+        row['error'] = f'{type(e).__name__}: {e}'
+    return row
+
+
+def run_backtest(engines=None, species=None, initial=INITIAL, horizon=HORIZON, step=STEP,
+                 workers=None, verbose=True):
+    """전체 엔진 × 파일어종 롤링 오리진 평가 → 결과 DataFrame (RESULT_COLUMNS)"""
+    data_ingest.ingest(workers=1)
+    cube = data_cube.load_cube('monthly')
+    engines = list(engines or forecast.ENGINES)
+    if species is None:
+        species = sorted(cube['파일어종'].dropna().unique())
+    series = {name: forecast.monthly_series(cube, name) for name in species}
+    tasks = [(e, name, series[name], initial, horizon, step) for e in engines for name in species]
+
+    rows = []
+
+    def _collect(row):
+        rows.append(row)
+        if verbose:
+            status = '실패: ' + row['error'] if row['error'] else f"MAPE {row['MAPE']:.2f}%"
+            print(f"  [{row['engine']}] {row['파일어종']}: {status}")
+
+    workers = min(workers or os.cpu_count() or 1, max(len(tasks), 1))
+    if workers <= 1:
+        for task in tasks:
+            _collect(_run_task(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for future in as_completed([executor.submit(_run_task, t) for t in tasks]):
+                _collect(future.result())
+
+    result = pd.DataFrame(rows).reindex(columns=RESULT_COLUMNS)
+    result['origins'] = result['origins'].astype('Int64')
+    return result.sort_values(['engine', '파일어종']).reset_index(drop=True)
+
+
+def summarize(result):
+    """엔진별 평균 (실패한 어종 제외)"""
+    ok = result[result['error'].isna()]
+    summary = ok.groupby('engine')[['MAPE', 'RMSE', 'coverage', 'fit_ms', 'predict_ms']].mean()
+    summary['species'] = ok.groupby('engine').size()
+    return summary.reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='예측 엔진 롤링 오리진 백테스트')
+    parser.add_argument('--engines', nargs='+', choices=sorted(forecast.ENGINES), default=None)
+    parser.add_argument('--species', nargs='+', default=None, help='평가할 파일어종 (기본: 전체)')
+    parser.add_argument('--initial', type=int, default=INITIAL, help='첫 기준월까지 최소 학습 개월 수')
+    parser.add_argument('--horizon', type=int, default=HORIZON, help='기준월마다 평가할 예측 개월 수')
+    parser.add_argument('--step', type=int, default=STEP, help='기준월 이동 간격 (개월)')
+    parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--csv', default=None, help='결과 CSV 저장 경로')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    result = run_backtest(args.engines, args.species, args.initial, args.horizon, args.step, args.workers)
+    wall = time.perf_counter() - start
+
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.float_format', '{:,.2f}'.format):
+        print()
+        print(result[result['error'].isna()].drop(columns='error').to_string(index=False))
+        failed = result[result['error'].notna()]
+        for (engine, error), group in failed.groupby(['engine', 'error']):
+            print(f'\n실패 [{engine}] {len(group)}개 어종: {error}')
+        print(f'\n엔진별 평균 (기준월 {args.initial}개월부터 {args.step}개월 간격, {args.horizon}개월 예측, 전체 {wall:.1f}s)')
+        print(summarize(result).to_string(index=False))
+    if args.csv:
+        result.to_csv(args.csv, index=False, encoding='utf-8-sig')
+        print(f'결과 CSV 저장: {args.csv}')
+
+
+if __name__ == '__main__':
+    main()
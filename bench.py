@@ -0,0 +1,355 @@
+# ============================================================
+# ⏱ 성능 측정 스크립트
+# ------------------------------------------------------------
+# 릴리스마다 같은 조건으로 돌려 수치를 비교하기 위한 벤치마크 모음
+# 실행:
+#   python bench.py parse [--workers N] [--repeat R]   # 월별 CSV 파싱 처리량 (rows/sec)
+#   python bench.py imports [--repeat R]                # 페이지 모듈 import 시간 (기동 비용)
+#   python bench.py intervals [--species S] [--repeat R] # Prophet 예측 구간 방식별 지연/정확도
+#   python bench.py engines [--repeat R]                # 예측 엔진별 전체 어종 학습+예측 시간
+#   python bench.py refresh [--species S] [--repeat R]  # 새 월 1개 추가 시 Prophet cold fit vs warm start
+#   python bench.py pipes [--data CSV]                  # 상세 검색 예측 파이프라인별 학습/예측 시간, 크기, 오차
+#   python bench.py seasonal [--scale N] [--repeat R]   # 제철 어종 계산 - 어종별 반복 vs 한 번의 groupby
+# ============================================================
+
+import io
+import os
+import sys
+import time
+import argparse
+import subprocess
+import tracemalloc
+
+import pandas as pd
+
+import data_cube
+import data_ingest
+
+
+def _best_of(func, repeat):
+    """func 를 repeat 번 실행해 (가장 빠른 시간, 마지막 결과) 반환"""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def _print_table(rows, headers):
+    widths = [max(len(str(h)), *(len(str(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print('  '.join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    print('  '.join('-' * w for w in widths))
+    for r in rows:
+        print('  '.join(str(v).ljust(w) for v, w in zip(r, widths)))
+
+
+# ============================================================
+# parse: 월별 CSV 파싱 처리량
+# ============================================================
+
+def _legacy_parse(sources):
+    # 기존 로더 방식: 문자열로 읽은 뒤 컬럼마다 쉼표 제거 + pd.to_numeric
+    frames = []
+    for src in sources:
+        df = pd.read_csv(src['path'], encoding='utf-8-sig')
+        for col in ['수량'] + data_ingest.PRICE_COLUMNS:
+            df[col] = df[col].astype(str).str.replace(',', '', regex=True)
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).round(0).astype(int)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def bench_parse(workers=None, repeat=3):
+    sources = data_ingest.discover_sources()
+    cases = [
+        ('legacy (str.replace)', lambda: _legacy_parse(sources)),
+        ('read-time decode, 1 process', lambda: data_ingest.parse_all(sources, workers=1)),
+    ]
+    workers = workers or os.cpu_count() or 1  # 기본은 코어 수 (parse_all 의 자동 선택과 무관하게 풀 측정)
+    if workers != 1:
+        label = f'read-time decode, pool({workers})'
+        cases.append((label, lambda: data_ingest.parse_all(sources, workers=workers)))
+
+    rows = []
+    for label, func in cases:
+        elapsed, df = _best_of(func, repeat)
+        rows.append((label, f'{len(df):,}', f'{elapsed:.3f}s', f'{len(df) / elapsed:,.0f}'))
+
+    print(f'월별 원천 CSV {len(sources)}개, best of {repeat}')
+    _print_table(rows, ['case', 'rows', 'time', 'rows/sec'])
+
+
+# ============================================================
+# imports: 페이지 모듈 import 시간 (새 프로세스에서 측정)
+# ============================================================
+
+# 지연 로딩 이전 app.py 가 기동 시 import 하던 모듈들
+EAGER_MODULES = ['app_home', 'app_ml', 'app_species', 'app_source', 'app_llm', 'app_ml2', 'app_chatbot']
+
+
+def _cold_import(modules):
+    """새 인터프리터에서 modules 를 import 하는 데 걸린 시간(초), 실패 시 예외 문자열"""
+    code = (
+        'import time, importlib\n'
+        't = time.perf_counter()\n'
+        f'for m in {modules!r}: importlib.import_module(m)\n'
+        'print(time.perf_counter() - t)\n'
+    )
+    proc = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return lines[-1] if lines else f'exit {proc.returncode}'
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def _best_cold_import(modules, repeat):
+    results = [_cold_import(modules) for _ in range(repeat)]
+    times = [r for r in results if isinstance(r, float)]
+    return f'{min(times):.2f}s' if times else f'실패 ({results[-1]})'
+
+
+def bench_imports(repeat=3):
+    import app
+    rows = [
+        ('기동: 전체 페이지 즉시 import (이전)', _best_cold_import(EAGER_MODULES, repeat)),
+        ('기동: app + 홈 (지연 로딩)', _best_cold_import(['app', app.PAGES['홈'][0]], repeat)),
+    ]
+    for name, (module, _) in app.PAGES.items():
+        rows.append((f'  {name} 최초 선택: {module}', _best_cold_import([module], repeat)))
+
+    print(f'새 프로세스 cold import, best of {repeat} (streamlit 런타임 밖에서 측정)')
+    _print_table(rows, ['case', 'time'])
+
+
+# ============================================================
+# intervals: Prophet 예측 구간 계산 방식 비교
+# ============================================================
+
+# 시뮬레이션 횟수 (0 = 잔차 분포 기반 구간), 첫 항목이 기준(Prophet 기본값)
+INTERVAL_SETTINGS = [1000, 1000, 300, 100, 0]
+
+
+def bench_intervals(species='갈치', repeat=3):
+    import forecast
+
+    series = forecast.monthly_series(data_cube.load_cube('monthly'), species)
+    model = forecast.fit_model(series)
+    base = forecast.predict_horizon(model, samples=INTERVAL_SETTINGS[0])
+    future = (base['step'] > 0).to_numpy()
+    history = ~future
+    base_width = (base['yhat_upper'] - base['yhat_lower']).to_numpy()[future]
+
+    rows = []
+    for i, samples in enumerate(INTERVAL_SETTINGS):
+        if i == 0:
+            continue
+        elapsed, table = _best_of(lambda: forecast.predict_horizon(model, samples=samples), repeat)
+        lower, upper = table['yhat_lower'].to_numpy(), table['yhat_upper'].to_numpy()
+        # 경계 오차: 예측 구간에서 기본 설정 경계와의 평균 거리 / 기본 구간 폭
+        diff = (abs(lower - base['yhat_lower'].to_numpy()) + abs(upper - base['yhat_upper'].to_numpy())) / 2
+        bound_err = (diff[future] / base_width).mean() * 100
+        # 적중률: 학습 구간 실제값이 구간 안에 든 비율 (목표 = interval_width)
+        y = series['y'].to_numpy()
+        coverage = ((y >= lower[history]) & (y <= upper[history])).mean() * 100
+        label = f'samples={samples}' if samples else 'residual bands'
+        if i == 1:
+            label += ' (기본값 재실행)'
+        rows.append((label, f'{elapsed * 1000:,.0f}ms', f'{bound_err:.1f}%', f'{coverage:.0f}%'))
+
+    print(f'{species}: 학습 {len(series)}개월 + 예측 {forecast.HORIZON}개월, best of {repeat}')
+    print(f'경계 오차 = 기본 설정(samples={INTERVAL_SETTINGS[0]}) 구간 대비, '
+          f'적중률 목표 = {forecast.INTERVAL_WIDTH:.0%}')
+    _print_table(rows, ['setting', 'predict', 'bound error', 'coverage'])
+
+
+# ============================================================
+# engines: 예측 엔진별 전체 어종 학습 + 5년 예측 시간
+# ============================================================
+
+def bench_engines(repeat=3):
+    import forecast
+
+    cube = data_cube.load_cube('monthly')
+    series = {name: forecast.monthly_series(cube, name) for name in sorted(cube['파일어종'].dropna().unique())}
+
+    rows = []
+    for name, engine in forecast.ENGINES.items():
+        def run():
+            models = engine.fit_many(series)
+            return {k: engine.predict(m) for k, m in models.items()}
+        try:
+            # Prophet 은 한 번만 (학습만 수 초 ~ 수십 초)
+            elapsed, tables = _best_of(run, repeat if engine.vectorized else 1)
+        except Exception as e:
+            rows.append((name, '-', f'실패 ({type(e).__name__}: {e})', '-'))
+            continue
+        mape = sum(forecast._metrics(series[k], t)['train_mape'] for k, t in tables.items()) / len(tables)
+        rows.append((name, len(tables), f'{elapsed * 1000:,.1f}ms', f'{mape:.2f}%'))
+
+    print(f'파일어종 {len(series)}개, 학습 + {forecast.HORIZON}개월 예측 (단일 프로세스)')
+    _print_table(rows, ['engine', 'species', 'fit+predict', 'train MAPE'])
+
+
+# ============================================================
+# refresh: 월별 갱신 (Prophet cold fit vs warm start)
+# ============================================================
+
+def bench_refresh(species='갈치', repeat=3):
+    import forecast
+
+    series = forecast.monthly_series(data_cube.load_cube('monthly'), species)
+    previous = forecast.fit_model(series.iloc[:-1])  # 지난달까지 학습된 모델
+    init = forecast.warm_start_params(previous)
+
+    cold, _ = _best_of(lambda: forecast.fit_model(series), repeat)
+    warm, _ = _best_of(lambda: forecast.fit_model(series, init=init), repeat)
+    rows = [('cold fit', f'{cold * 1000:,.0f}ms', '100%'),
+            ('warm start', f'{warm * 1000:,.0f}ms', f'{warm / cold:.0%}')]
+
+    print(f'{species}: {len(series) - 1}개월 모델에 1개월 추가, best of {repeat}')
+    _print_table(rows, ['case', 'fit', 'vs cold'])
+
+
+# ============================================================
+# pipes: 상세 검색 예측 파이프라인 비교 (rf vs hgb)
+# ============================================================
+
+def bench_pipes(data_path=None, test_fraction=0.2, repeat=3):
+    import joblib
+    import numpy as np
+    import price_model
+
+    data_path = data_path or price_model.AI_DATA_PATH
+    df = pd.read_csv(data_path, usecols=price_model.FEATURE_COLUMNS + [price_model.TARGET_COLUMN]).dropna()
+    test = df.sample(frac=test_fraction, random_state=0)
+    train = df.drop(test.index)
+    X_test, y_test = test[price_model.FEATURE_COLUMNS], test[price_model.TARGET_COLUMN].to_numpy(dtype='float64')
+    one = X_test.iloc[[0]]
+
+    rows = []
+    for model in price_model.PIPE_MODELS:
+        # 학습은 1회 (tracemalloc 으로 학습 중 최대 할당량 측정)
+        tracemalloc.start()
+        start = time.perf_counter()
+        pipe, X_train, _ = price_model.fit_pipeline(train, model)
+        fit = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        batch, (pred, lower, _, upper) = _best_of(lambda: price_model.predict_interval(pipe, X_test), repeat)
+        single, _ = _best_of(lambda: price_model.predict_interval(pipe, one), repeat)
+        buf = io.BytesIO()
+        joblib.dump(pipe, buf)
+
+        err = np.abs(y_test - pred)
+        nonzero = y_test != 0
+        coverage = ((y_test >= lower) & (y_test <= upper)).mean() * 100
+        rows.append((model, f'{len(X_train):,}', f'{fit:,.1f}s', f'{peak / 1e6:,.0f}MB',
+                     f'{single * 1000:,.1f}ms', f'{batch * 1000:,.0f}ms', f'{buf.tell() / 1e6:,.1f}MB',
+                     f'{err.mean():,.0f}', f'{(err[nonzero] / y_test[nonzero]).mean() * 100:.1f}%', f'{coverage:.0f}%'))
+
+    print(f'{data_path}: 학습 후보 {len(train):,}행 / 평가 {len(test):,}행, 예측은 구간 포함 best of {repeat}')
+    print('학습 메모리 = 학습 중 Python/NumPy 최대 할당량 (tracemalloc), 적중률 목표 = 90% (5~95% 구간)')
+    _print_table(rows, ['model', 'train rows', 'fit', 'fit memory', 'predict 1', f'predict {len(test):,}',
+                        'size', 'MAE', 'MAPE', 'coverage'])
+
+
+# ============================================================
+# seasonal: 제철 어종 (어종별 최저가 월) 계산
+# ============================================================
+
+def _legacy_seasonal(df):
+    # 기존 홈 화면 방식: 어종마다 전체 행 마스크 + groupby + idxmin
+    seasonal_data = []
+    for species in df['파일어종'].unique():
+        species_df = df[df['파일어종'] == species]
+        monthly_avg = species_df.groupby('month').agg({'평균가': 'mean', 'date': 'count'}).reset_index()
+        monthly_avg.columns = ['month', 'avg_price', 'count']
+        monthly_avg = monthly_avg[monthly_avg['count'] >= 10]
+        if len(monthly_avg) > 0:
+            best_month = monthly_avg.loc[monthly_avg['avg_price'].idxmin()]
+            seasonal_data.append({'species': species, 'best_month': int(best_month['month']),
+                                  'avg_price': int(best_month['avg_price'])})
+    return pd.DataFrame(seasonal_data)
+
+
+def bench_seasonal(scale=10, repeat=3):
+    import seasonal
+
+    base = data_ingest.load_store(columns=['파일어종', 'month', 'date', '평균가', '수량',
+                                           '어종', '산지', '전처리', '낙찰고가', '낙찰저가'])
+    rows = []
+    for factor in (1, scale):
+        df = pd.concat([base] * factor, ignore_index=True)
+        monthly = data_cube.build_cube(df)['monthly']
+
+        legacy, expected = _best_of(lambda: _legacy_seasonal(df), repeat)
+        grouped, table = _best_of(lambda: seasonal.best_months(df), repeat)
+        cubed, cube_table = _best_of(lambda: seasonal.best_months(monthly), repeat)
+        index = seasonal.index_by_month(cube_table)
+        query, _ = _best_of(lambda: seasonal.recommend(index), repeat)
+
+        expected = expected.sort_values('species', ignore_index=True)
+        for result in (table, cube_table):
+            pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+        rows.append((f'x{factor}', f'{len(df):,}', f'{len(expected)}', f'{legacy * 1000:,.1f}ms',
+                     f'{grouped * 1000:,.1f}ms', f'{cubed * 1000:,.1f}ms', f'{query * 1000:,.2f}ms',
+                     f'{legacy / grouped:,.1f}x'))
+
+    print(f'원본 {len(base):,}행을 복제해 측정, best of {repeat} (세 방식 결과 일치 확인)')
+    print('groupby(cube) = 적재 시 만든 월별 큐브에서 계산 (큐브 생성 시간 제외), query = 저번/이번/다음 달 조회')
+    _print_table(rows, ['scale', 'rows', 'species', 'per-species loop', 'groupby(rows)',
+                        'groupby(cube)', 'query', 'speedup'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='호갱제로 성능 측정')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('parse', help='월별 CSV 파싱 처리량 (rows/sec)')
+    p.add_argument('--workers', type=int, default=None)
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('imports', help='페이지 모듈 import 시간 (기동 비용)')
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('intervals', help='Prophet 예측 구간 방식별 지연/정확도')
+    p.add_argument('--species', default='갈치')
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('engines', help='예측 엔진별 전체 어종 학습+예측 시간')
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('refresh', help='새 월 1개 추가 시 Prophet cold fit vs warm start')
+    p.add_argument('--species', default='갈치')
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('pipes', help='상세 검색 예측 파이프라인별 학습/예측 시간, 크기, 오차')
+    p.add_argument('--data', default=None, help='학습 데이터 CSV (기본: data/ai데이터가공.csv)')
+    p.add_argument('--repeat', type=int, default=3)
+
+    p = sub.add_parser('seasonal', help='제철 어종 계산 - 어종별 반복 vs 한 번의 groupby')
+    p.add_argument('--scale', type=int, default=10, help='원본 행을 몇 배로 복제해 측정할지')
+    p.add_argument('--repeat', type=int, default=3)
+
+    args = parser.parse_args()
+    if args.command == 'parse':
+        bench_parse(workers=args.workers, repeat=args.repeat)
+    elif args.command == 'imports':
+        bench_imports(repeat=args.repeat)
+    elif args.command == 'intervals':
+        bench_intervals(species=args.species, repeat=args.repeat)
+    elif args.command == 'engines':
+        bench_engines(repeat=args.repeat)
+    elif args.command == 'refresh':
+        bench_refresh(species=args.species, repeat=args.repeat)
+    elif args.command == 'pipes':
+        bench_pipes(data_path=args.data, repeat=args.repeat)
+    elif args.command == 'seasonal':
+        bench_seasonal(scale=args.scale, repeat=args.repeat)
+
+
+if __name__ == '__main__':
+    main()
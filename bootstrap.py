@@ -0,0 +1,68 @@
+# ============================================================
+# 🚀 앱 기동 설정 (프로세스당 1회)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 페이지마다 반복하던 한글 폰트/matplotlib 스타일 설정을 한 곳으로 모음
+#   - 경매 데이터 캐시를 첫 화면에서 미리 채움
+#   - 페이지 모듈(app_*.py)은 import 시 부수효과 없이 함수 정의만 하도록 유지
+# 사용:
+#   app.py 의 main() 첫 줄에서 bootstrap.init() 호출 (재실행마다 불러도 비용 없음)
+# ============================================================
+
+import matplotlib.pyplot as plt
+from matplotlib import font_manager, rc
+from koreanize_matplotlib import koreanize
+import streamlit as st
+
+import data_store
+
+
+# 한글 폰트 후보 (OS 자동 인식, 없으면 koreanize 기본 폰트만 사용)
+FONT_PATHS = [
+    "/System/Library/Fonts/AppleSDGothicNeo.ttc",  # macOS
+    "C:/Windows/Fonts/malgun.ttf",  # Windows
+]
+
+_rendering_ready = False
+
+# 페이지 모듈 → 최초 import 소요 시간(초) (app.load_page 가 기록, 서버 프로세스 단위로 유지)
+IMPORT_TIMES = {}
+
+
+def setup_rendering():
+    """한글 폰트 + matplotlib 공통 스타일 (프로세스당 1회)"""
+    global _rendering_ready
+    if _rendering_ready:
+        return
+
+    for font_path in FONT_PATHS:
+        try:
+            font_name = font_manager.FontProperties(fname=font_path).get_name()
+        except Exception:
+            continue
+        rc('font', family=font_name)
+        break
+    plt.rcParams['axes.unicode_minus'] = False
+    plt.style.use('seaborn-v0_8-whitegrid')
+    plt.rcParams['axes.titlesize'] = 13
+    plt.rcParams['axes.labelsize'] = 11
+    plt.rcParams['legend.fontsize'] = 10
+    koreanize()  # 보조 폰트 지정
+    _rendering_ready = True
+
+
+def warm_data():
+    """경매 테이블/집계 큐브/홈 화면 스냅샷을 공용 캐시에 적재 (이미 있으면 캐시 조회만)"""
+    data_store.load_auction()
+    for grain in ('daily', 'monthly'):
+        data_store.load_cube(grain)
+    data_store.load_home_snapshot()
+
+
+def init():
+    setup_rendering()
+    try:
+        warm_data()
+    except Exception as e:
+        st.error(f"데이터를 불러올 수 없습니다. 파일 경로를 확인해주세요. ({e})")
+        st.stop()
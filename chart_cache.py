@@ -0,0 +1,82 @@
+# ============================================================
+# 🖼 렌더링된 차트 이미지 캐시 (서버 프로세스 공용)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 데이터가 바뀌지 않았는데 재실행마다 matplotlib 으로 같은 차트를 다시 그리지 않도록
+#     렌더링 결과(PNG)를 보관
+#   - 키 = 차트 이름 + 스타일 설정 + 그린 데이터 값의 해시 (model_registry.fingerprint)
+#     → 새 경매일이 들어와 데이터가 바뀌면 자연히 새 키가 됨
+#   - 전체 크기(MAX_BYTES) 를 넘으면 가장 오래 쓰지 않은 이미지부터 제거 (LRU)
+# 사용:
+#   chart_cache.show('home_mini', species_data, render_func, title='갈치')
+#   render_func(data, **style) 는 matplotlib Figure 를 반환 (캐시에 없을 때만 호출)
+# ============================================================
+
+import io
+import threading
+from collections import OrderedDict
+
+import streamlit as st
+
+import model_registry
+
+
+MAX_BYTES = 32 * 1024 * 1024  # 캐시 전체 PNG 크기 상한
+SAVEFIG = {'format': 'png', 'dpi': 200, 'bbox_inches': 'tight'}  # st.pyplot 기본 저장 설정과 동일
+
+_lock = threading.Lock()
+_images = OrderedDict()  # 키 → PNG bytes (앞쪽이 가장 오래 쓰지 않은 항목)
+_size = 0
+stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+
+def chart_key(name, data, style):
+    """차트 이름 + 스타일 + 데이터(컬럼명과 값) 해시"""
+    return model_registry.fingerprint(data, {'chart': name, **style})
+
+
+def _put(key, image):
+    global _size
+    with _lock:
+        if key in _images:
+            return
+        _images[key] = image
+        _size += len(image)
+        while _size > MAX_BYTES and len(_images) > 1:
+            _, old = _images.popitem(last=False)
+            _size -= len(old)
+            stats['evictions'] += 1
+
+
+def render_png(name, data, render, **style):
+    """캐시된 PNG (없으면 render(data, **style) 로 그려서 저장)"""
+    key = chart_key(name, data, style)
+    with _lock:
+        image = _images.get(key)
+        if image is not None:
+            _images.move_to_end(key)
+            stats['hits'] += 1
+            return image
+        stats['misses'] += 1
+
+    import matplotlib.pyplot as plt
+
+    fig = render(data, **style)
+    buf = io.BytesIO()
+    fig.savefig(buf, **SAVEFIG)
+    plt.close(fig)
+    image = buf.getvalue()
+    _put(key, image)
+    return image
+
+
+def show(name, data, render, **style):
+    """st.pyplot 대신 캐시된 차트 이미지를 표시"""
+    st.image(render_png(name, data, render, **style), width='stretch')
+
+
+def clear():
+    global _size
+    with _lock:
+        _images.clear()
+        _size = 0
@@ -0,0 +1,120 @@
+# ============================================================
+# 🧊 경매가 집계 큐브 (일별/월별 × 파일어종 × 어종 × 산지 × 전처리)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 페이지마다 원본 행 전체에 반복하던 groupby 를 적재 시점에 한 번만 계산
+#   - 평균은 합계/건수로 저장해 어떤 차원으로 다시 묶어도 원본 평균과 동일
+#     (평균의 평균 오류 없음), 수량 가중 평균가도 같은 방식으로 계산
+# 저장 위치:
+#   data/cube/daily.parquet, data/cube/monthly.parquet
+#   - 원본 거래일이 모두 매월 1일(월 단위 자료)이면 일별 큐브는 월별 큐브와 행까지 같음
+#     → monthly.parquet 하나만 저장하고 'daily' 조회도 월별 파일을 읽음
+#     (daily 단위는 일 단위 자료가 들어올 때를 위해서만 유지)
+# ============================================================
+
+import os
+
+import pandas as pd
+
+import model_registry
+
+
+CUBE_DIR = os.path.join('data', 'cube')
+GRAINS = ('daily', 'monthly')
+KEYS = ['파일어종', '어종', '산지', '전처리']
+
+PRICES = ['평균가', '낙찰고가', '낙찰저가']
+
+# 다시 묶을 때 사용할 집계 함수 (합계류는 sum, 극값은 min/max)
+_MEASURES = {'count': 'sum', '수량_sum': 'sum', '금액_sum': 'sum'}
+for _col in PRICES:
+    _MEASURES.update({f'{_col}_sum': 'sum', f'{_col}_min': 'min', f'{_col}_max': 'max'})
+
+
+def cube_path(grain, cube_dir=CUBE_DIR):
+    return os.path.join(cube_dir, f'{grain}.parquet')
+
+
+# ============================================================
+# 생성 (적재 시점)
+# ============================================================
+
+def build_cube(df):
+    """원본 거래 행 → {'daily': DataFrame, 'monthly': DataFrame}"""
+    df = df.assign(금액=df['평균가'].astype('float64') * df['수량'].astype('float64'))
+    aggs = {'count': ('평균가', 'size'), '수량_sum': ('수량', 'sum'), '금액_sum': ('금액', 'sum')}
+    for col in PRICES:
+        aggs.update({f'{col}_sum': (col, 'sum'), f'{col}_min': (col, 'min'), f'{col}_max': (col, 'max')})
+    daily = df.groupby(KEYS + ['date'], dropna=False, sort=True).agg(**aggs).reset_index()
+    for col in PRICES:
+        daily[f'{col}_sum'] = daily[f'{col}_sum'].astype('int64')
+
+    if daily['date'].dt.is_month_start.all():
+        monthly = daily  # 월 단위 자료 → 다시 묶어도 같은 큐브, 같은 객체를 공유
+    else:
+        monthly = daily.assign(date=daily['date'].dt.to_period('M').dt.to_timestamp())
+        monthly = monthly.groupby(KEYS + ['date'], dropna=False, sort=True).agg(_MEASURES).reset_index()
+
+    for cube in {id(daily): daily, id(monthly): monthly}.values():
+        cube['year'] = cube['date'].dt.year.astype('int32')
+        cube['month'] = cube['date'].dt.month.astype('int32')
+    return {'daily': daily, 'monthly': monthly}
+
+
+def stored_grain(grain, cube_dir=CUBE_DIR):
+    """grain 을 실제로 읽을 파일의 grain (일별 파일이 없으면 월별과 같은 큐브라 'monthly')"""
+    if grain not in GRAINS:
+        raise ValueError(f'grain 은 {GRAINS} 중 하나여야 합니다: {grain}')
+    if grain == 'daily' and not os.path.exists(cube_path('daily', cube_dir)):
+        return 'monthly'
+    return grain
+
+
+def save_cube(cubes, cube_dir=CUBE_DIR):
+    """큐브를 고유한 임시 파일에 쓴 뒤 교체 (model_registry.atomic_write)
+
+    일별 큐브가 월별 큐브와 같은 객체면(build_cube, 월 단위 자료) 일별 파일은 쓰지 않고
+    이전 적재에서 남은 일별 파일을 지움 → load_cube('daily') 가 월별 파일을 읽음
+    """
+    for grain, cube in cubes.items():
+        if grain != 'monthly' and cube is cubes.get('monthly'):
+            try:
+                os.remove(cube_path(grain, cube_dir))
+            except FileNotFoundError:
+                pass
+            continue
+        model_registry.atomic_write(cube_path(grain, cube_dir), lambda tmp, cube=cube: cube.to_parquet(tmp, index=False))
+
+
+def load_cube(grain='monthly', cube_dir=CUBE_DIR):
+    return pd.read_parquet(cube_path(stored_grain(grain, cube_dir), cube_dir))
+
+
+# ============================================================
+# 조회
+# ============================================================
+
+def rollup(cube, by, **filters):
+    """큐브를 by 차원으로 다시 묶어 평균/최소/최대/건수/가중평균 계산
+
+    by      : 묶을 컬럼 목록 (예: ['date'], ['파일어종', 'year', 'month'], ['month'])
+    filters : 컬럼=값 조건 (예: 파일어종='갈치', 산지='목포')
+    반환 컬럼: by + 평균가/낙찰고가/낙찰저가 (평균) 와 각각의 _min/_max, count, 수량, 가중평균가
+    """
+    for col, value in filters.items():
+        cube = cube[cube[col] == value]
+    by = list(by)
+    if by:
+        g = cube.groupby(by, sort=True).agg(_MEASURES).reset_index()
+    else:
+        g = cube.agg(_MEASURES).to_frame().T
+
+    out = g[by].copy()
+    for col in PRICES:
+        out[col] = g[f'{col}_sum'] / g['count']
+        out[f'{col}_min'] = g[f'{col}_min']
+        out[f'{col}_max'] = g[f'{col}_max']
+    out['count'] = g['count'].astype('int64')
+    out['수량'] = g['수량_sum']
+    out['가중평균가'] = (g['금액_sum'] / g['수량_sum']).where(g['수량_sum'] > 0)
+    return out.reset_index(drop=True)
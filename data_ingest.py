@@ -0,0 +1,375 @@
+# ============================================================
+# 🐟 수산물 경매 원천 CSV 적재 (data/<어종>csv/<year>/<year>-<month>.csv → Parquet)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 월별 원천 CSV 를 파일어종/연도/월 단위 Parquet 저장소로 변환
+#   - 내용 해시가 바뀌지 않은 파일은 건너뛰는 증분 적재
+#   - 노트북(csv파일변환 및 가공테스트)에서 추가하던 파생 컬럼 생성
+#     (파일어종, year, month, date, 전처리, 품목명, 공통어종)
+#   - 적재 후 일별/월별 집계 큐브(data/cube)와 홈 화면 스냅샷(home_snapshot) 갱신
+#   - 서버 프로세스/CLI(forecast, backtest)가 동시에 적재하지 않도록 저장소 잠금
+#     (model_registry.file_lock), 파일은 고유한 임시 파일에 쓴 뒤 교체(atomic_write)
+# 실행:
+#   python data_ingest.py          # 증분 적재
+#   python data_ingest.py --full   # 전체 재적재
+#   python data_ingest.py --csv    # 통합 CSV(수산물_통합전처리_3컬럼.csv)도 함께 저장
+# ============================================================
+
+import os
+import re
+import glob
+import json
+import hashlib
+import argparse
+import warnings
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import data_cube
+import home_snapshot
+import model_registry
+
+
+DATA_DIR = 'data'
+STORE_DIR = os.path.join(DATA_DIR, 'parquet')
+MANIFEST_PATH = os.path.join(STORE_DIR, '_manifest.json')
+MERGED_CSV_PATH = os.path.join(DATA_DIR, '수산물_통합전처리_3컬럼.csv')
+
+RAW_COLUMNS = ['어종', '산지', '규격', '포장', '수량', '중량', '낙찰고가', '낙찰저가', '평균가']
+PRICE_COLUMNS = ['낙찰고가', '낙찰저가', '평균가']
+
+# workers 를 지정하지 않았을 때 프로세스 풀을 쓰는 원천 CSV 총 크기 하한
+# 월별 파일은 작아서(현재 576개, 평균 4.5KB, 총 2.6MB) 프로세스 기동/결과 전달 비용이 파싱보다 큼
+# (bench.py parse 실측: 1 프로세스 14.5k rows/s, pool(4) 10.1k rows/s) → 그 이하는 현재 프로세스에서 파싱
+POOL_MIN_BYTES = 64 * 1024 * 1024
+
+# 모든 파티션이 같은 스키마를 갖도록 고정 (빈 파일/결측 컬럼 대비)
+SCHEMA = pa.schema([
+    ('어종', pa.string()),
+    ('산지', pa.string()),
+    ('규격', pa.string()),
+    ('포장', pa.string()),
+    ('수량', pa.float32()),
+    ('중량', pa.float32()),
+    ('낙찰고가', pa.int32()),
+    ('낙찰저가', pa.int32()),
+    ('평균가', pa.int32()),
+    ('파일어종', pa.string()),
+    ('year', pa.int32()),
+    ('month', pa.int32()),
+    ('date', pa.timestamp('ns')),
+    ('전처리', pa.string()),
+    ('품목명', pa.string()),
+    ('공통어종', pa.string()),
+])
+
+_SPECIES_DIR_RE = re.compile(r'^(.+)csv$')
+_MONTH_FILE_RE = re.compile(r'^(\d{4})-(\d{1,2})\.csv$')
+
+
+# ============================================================
+# 원천 파일 탐색
+# ============================================================
+
+def discover_sources(data_dir=DATA_DIR):
+    """data/<어종>csv/<year>/<year>-<month>.csv 목록을 (파일어종, 연도, 월) 순으로 반환"""
+    sources = []
+    for species_dir in sorted(os.listdir(data_dir)):
+        m = _SPECIES_DIR_RE.match(species_dir)
+        species_path = os.path.join(data_dir, species_dir)
+        if not m or not os.path.isdir(species_path):
+            continue
+        species = m.group(1)
+        for year_dir in sorted(os.listdir(species_path)):
+            year_path = os.path.join(species_path, year_dir)
+            if not year_dir.isdigit() or not os.path.isdir(year_path):
+                continue
+            for name in os.listdir(year_path):
+                fm = _MONTH_FILE_RE.match(name)
+                if not fm or fm.group(1) != year_dir:
+                    continue
+                sources.append({
+                    'path': os.path.join(year_path, name),
+                    'species': species,
+                    'year': int(fm.group(1)),
+                    'month': int(fm.group(2)),
+                })
+    sources.sort(key=lambda s: (s['species'], s['year'], s['month']))
+    return sources
+
+
+def source_key(src):
+    """매니페스트 키 (운영체제와 무관하게 / 구분자 사용)"""
+    return f"{src['species']}/{src['year']}/{src['year']}-{src['month']}.csv"
+
+
+def partition_path(src, store_dir=STORE_DIR):
+    """파일어종/연도/월 파티션 경로"""
+    return os.path.join(store_dir, src['species'], str(src['year']),
+                        f"{src['year']}-{src['month']:02d}.parquet")
+
+
+def stored_partitions(store_dir=STORE_DIR):
+    """저장소에 있는 파티션 파일 경로 목록 (파일어종/연도/월.parquet, 쓰는 중인 '.' 임시 파일 제외)"""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(glob.glob(os.path.join(store_dir, '*', '*', '*.parquet')))
+
+
+def file_hash(path):
+    """파일 내용 해시 (변경 감지용)"""
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+# ============================================================
+# 파싱 및 파생 컬럼
+# ============================================================
+
+# 읽기 단계에서 쉼표 천단위 숫자를 바로 디코딩 ("18,000" → 18000)
+_STRING_DTYPES = {'어종': str, '산지': str, '규격': str, '포장': str}
+_READ_DTYPES = {**_STRING_DTYPES, '수량': 'float32', '중량': 'float32',
+                '낙찰고가': 'int32', '낙찰저가': 'int32', '평균가': 'int32'}
+_FALLBACK_DTYPES = {**_STRING_DTYPES, '수량': 'float64', '중량': 'float64',
+                    '낙찰고가': 'float64', '낙찰저가': 'float64', '평균가': 'float64'}
+
+
+def read_month_file(path):
+    """월별 원천 CSV 를 읽으면서 숫자 컬럼을 바로 디코딩
+
+    가격(낙찰고가/낙찰저가/평균가)은 int32, 수량/중량은 float32 로 읽는다.
+    수량에는 소수(kg 단위) 거래가 섞여 있어 정수로 자르지 않는다.
+    결측이나 소수 가격이 있는 파일만 float 로 다시 읽어 반올림한다.
+    """
+    read_kwargs = dict(encoding='utf-8-sig', thousands=',')
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            df = pd.read_csv(path, dtype=_READ_DTYPES, **read_kwargs)
+    except ValueError:
+        df = pd.read_csv(path, dtype=_FALLBACK_DTYPES, **read_kwargs)
+        for col in PRICE_COLUMNS:
+            df[col] = df[col].fillna(0).round(0).astype('int32')
+        for col in ['수량', '중량']:
+            df[col] = df[col].astype('float32')
+    return df.reindex(columns=RAW_COLUMNS)
+
+
+_PRE_RE = re.compile(r'^\((.*?)\)')
+_ITEM_RE = re.compile(r'^[가-힣]+(?:\([A-Za-z/]+\))?')
+_HANGUL_RE = re.compile(r'^[가-힣]+')
+
+
+@lru_cache(maxsize=None)
+def split_species_name(name, species_list):
+    """어종명 → (전처리, 품목명, 공통어종)
+
+    (냉)명태(H/G) → ('냉', '명태(H/G)', '명태'), 꽁치 → ('일반', '꽁치', '꽁치')
+    고유 어종명이 수백 개뿐이라 결과를 캐시해 파일마다 반복 계산하지 않는다.
+    """
+    m = _PRE_RE.match(name)
+    pre = m.group(1) if m else '일반'
+    main = _PRE_RE.sub('', name).strip()
+    m = _ITEM_RE.match(main)
+    item = m.group(0) if m else main
+    common = next((fish for fish in species_list if fish in item), None)
+    if common is None:
+        m = _HANGUL_RE.match(item)
+        common = m.group(0) if m else item
+    return pre, item, common
+
+
+def add_name_columns(df, species_list):
+    """어종명에서 전처리/품목명/공통어종 컬럼 생성 (고유 어종명 단위로 계산 후 매핑)"""
+    species_list = tuple(species_list)
+    names = df['어종'].astype(str)
+    parts = {n: split_species_name(n, species_list) for n in names.unique()}
+    for i, col in enumerate(['전처리', '품목명', '공통어종']):
+        df[col] = names.map({n: p[i] for n, p in parts.items()})
+    return df
+
+
+def read_source(src):
+    """월별 원천 CSV 한 개를 읽고 파일 경로에서 파일어종/year/month/date 를 채움"""
+    df = read_month_file(src['path'])
+    df['파일어종'] = src['species']
+    df['year'] = src['year']
+    df['month'] = src['month']
+    df['date'] = pd.Timestamp(year=src['year'], month=src['month'], day=1)
+    return df
+
+
+def parse_source(src, species_list):
+    """월별 원천 CSV 한 개를 읽어 저장소 스키마의 DataFrame 으로 변환"""
+    return add_name_columns(read_source(src), species_list)
+
+
+def _run_tasks(func, tasks, workers=None):
+    """작업 목록을 프로세스 풀로 실행 (workers=1 이거나 작업이 하나면 현재 프로세스에서 실행)"""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        return [func(t) for t in tasks]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, tasks, chunksize=chunksize))
+
+
+def parse_all(sources=None, workers=None, species_list=None):
+    """월별 원천 CSV 를 프로세스 풀로 병렬 파싱해 하나의 DataFrame 으로 반환
+
+    파일 읽기/숫자 디코딩은 워커에서, 어종명 파생 컬럼은 합친 뒤 한 번에 계산한다.
+    workers 가 None 이면 원천 총 크기가 POOL_MIN_BYTES 이상일 때만 CPU 코어 수만큼 병렬 처리
+    """
+    if sources is None:
+        sources = discover_sources()
+    if species_list is None:
+        species_list = sorted({s['species'] for s in sources})
+    if workers is None and sum(os.path.getsize(s['path']) for s in sources) < POOL_MIN_BYTES:
+        workers = 1
+    frames = [f for f in _run_tasks(read_source, sources, workers) if len(f)]
+    if not frames:
+        return pd.DataFrame(columns=SCHEMA.names)
+    df = pd.concat(frames, ignore_index=True)
+    return add_name_columns(df, species_list)
+
+
+def write_partition(df, path):
+    """파티션 한 개를 임시 파일에 쓴 뒤 교체 (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)"""
+    table = pa.Table.from_pandas(df[SCHEMA.names], schema=SCHEMA, preserve_index=False)
+    model_registry.atomic_write(path, lambda tmp: pq.write_table(table, tmp))
+
+
+# ============================================================
+# 매니페스트
+# ============================================================
+
+def load_manifest(path=MANIFEST_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    model_registry.atomic_write(path, write)
+
+
+# ============================================================
+# 적재
+# ============================================================
+
+def ingest(data_dir=DATA_DIR, store_dir=STORE_DIR, cube_dir=data_cube.CUBE_DIR,
+           full=False, workers=None, verbose=False):
+    """원천 CSV → Parquet 증분 적재
+
+    내용 해시가 매니페스트와 같고 파티션 파일이 남아 있으면 건너뛴다.
+    변경된 파일의 파싱은 프로세스 풀(workers)로 병렬 처리한다.
+    원천에서 사라진 파일의 파티션은 삭제하고, 변경이 있으면 집계 큐브(data_cube)도 다시 만든다.
+    전체 과정은 저장소 잠금(store_dir/_ingest.lock) 안에서 실행 - 다른 프로세스가 적재 중이면 기다린 뒤
+    (그 결과가 매니페스트에 반영돼 있으므로) 남은 변경만 처리
+    반환값: {'sources', 'changed', 'removed', 'rows'} 요약 dict
+    """
+    with model_registry.file_lock(os.path.join(store_dir, '_ingest')):
+        manifest_path = os.path.join(store_dir, '_manifest.json')
+        manifest = {} if full else load_manifest(manifest_path)
+        sources = discover_sources(data_dir)
+        species_list = sorted({s['species'] for s in sources})
+
+        changed = []
+        seen = set()
+        for src in sources:
+            key = source_key(src)
+            seen.add(key)
+            digest = file_hash(src['path'])
+            entry = manifest.get(key)
+            if entry and entry.get('hash') == digest and os.path.exists(partition_path(src, store_dir)):
+                continue
+            changed.append((key, src, digest))
+
+        rows = 0
+        if changed:
+            df = parse_all([src for _, src, _ in changed], workers, species_list)
+            groups = dict(list(df.groupby(['파일어종', 'year', 'month'], sort=False)))
+            empty = df.iloc[0:0]
+            for key, src, digest in changed:
+                part = groups.get((src['species'], src['year'], src['month']), empty)
+                write_partition(part, partition_path(src, store_dir))
+                manifest[key] = {'hash': digest, 'rows': len(part)}
+                rows += len(part)
+                if verbose:
+                    print(f'  적재: {key} ({len(part):,}행)')
+
+        # 원천에 없는 파티션은 매니페스트가 아니라 저장소 폴더 기준으로 삭제
+        # (full 적재는 매니페스트를 비우고 시작하므로 매니페스트로는 사라진 원천을 알 수 없음)
+        expected = {partition_path(src, store_dir) for src in sources}
+        removed = [path for path in stored_partitions(store_dir) if path not in expected]
+        for path in removed:
+            os.remove(path)
+        dropped = [key for key in manifest if key not in seen]
+        for key in dropped:
+            del manifest[key]
+
+        # 저장소가 바뀌었거나 큐브가 없으면 집계 큐브 + 홈 화면 스냅샷 재생성
+        cube_missing = not all(os.path.exists(data_cube.cube_path(data_cube.stored_grain(g, cube_dir), cube_dir))
+                               for g in data_cube.GRAINS)
+        if changed or removed or cube_missing:
+            cubes = data_cube.build_cube(load_store(store_dir))
+            data_cube.save_cube(cubes, cube_dir)
+            home_snapshot.save_snapshot(home_snapshot.build_snapshot(cubes), cube_dir)
+        elif not os.path.exists(home_snapshot.snapshot_path(cube_dir)):
+            cubes = {g: data_cube.load_cube(g, cube_dir) for g in data_cube.GRAINS}
+            home_snapshot.save_snapshot(home_snapshot.build_snapshot(cubes), cube_dir)
+
+        # 매니페스트는 마지막에 기록 (data_store 가 매니페스트 버전으로 캐시를 갱신하므로
+        # 바뀐 매니페스트를 보면 큐브/스냅샷도 이미 새것)
+        if changed or removed or dropped or not os.path.exists(manifest_path):
+            save_manifest(manifest, manifest_path)
+
+        return {'sources': len(sources), 'changed': len(changed), 'removed': len(removed), 'rows': rows}
+
+
+def load_store(store_dir=STORE_DIR, columns=None):
+    """Parquet 저장소 전체를 하나의 DataFrame 으로 로드"""
+    df = pd.read_parquet(store_dir, columns=columns)
+    sort_cols = [c for c in ['파일어종', 'date'] if c in df.columns]
+    if sort_cols:
+        df = df.sort_values(sort_cols, kind='stable').reset_index(drop=True)
+    return df
+
+
+def export_merged_csv(path=MERGED_CSV_PATH, store_dir=STORE_DIR):
+    """노트북 호환용 통합 CSV 저장 (수산물_통합전처리_3컬럼.csv)"""
+    df = load_store(store_dir)
+    df.to_csv(path, index=False, encoding='utf-8-sig')
+    return len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='월별 경매 CSV → Parquet 증분 적재')
+    parser.add_argument('--full', action='store_true', help='해시와 무관하게 전체 재적재')
+    parser.add_argument('--csv', action='store_true', help='통합 CSV 도 함께 저장')
+    parser.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수 (기본: 원천이 작으면 1, POOL_MIN_BYTES 이상이면 CPU 코어 수)')
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    summary = ingest(full=args.full, workers=args.workers, verbose=args.verbose)
+    print(f"원천 {summary['sources']}개 / 변경 {summary['changed']}개 / 삭제 {summary['removed']}개 "
+          f"/ 적재 {summary['rows']:,}행")
+    if args.csv:
+        n = export_merged_csv()
+        print(f'통합 CSV 저장: {MERGED_CSV_PATH} ({n:,}행)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+# ============================================================
+# 🐟 경매 데이터 공용 접근 계층
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 서버 프로세스당 한 번만 로드해 모든 페이지/세션이 같은 DataFrame 을 공유
+#     (st.cache_data 는 호출마다 복사본을 돌려주므로 st.cache_resource 사용)
+#   - 어종/산지/기간 조회용 접근자와 집계 큐브(rollup) 조회 제공
+#   - 캐시는 적재 매니페스트/예측 테이블 파일의 버전(수정 시각, 크기)별로 보관
+#     → 다른 프로세스(forecast.py refresh/train, data_ingest.py)가 새 데이터를 적재하거나
+#       학습하면 다음 호출부터 새 파일을 읽음 (오래된 큐브로 지문을 계산해 재학습하지 않도록)
+# 주의:
+#   - load_auction() 이 돌려주는 DataFrame 은 모든 세션이 공유하는 읽기 전용 객체
+#     컬럼 추가·inplace 수정이 필요하면 반드시 .copy() 후 사용
+# ============================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import data_cube
+import data_ingest
+import forecast
+import home_snapshot
+
+
+AI_DATA_PATH = os.path.join('data', 'ai데이터가공.csv')
+AI_COLUMNS = ['파일어종', '산지_그룹화', '규격_등급', '포장_분류', '수량', '중량', '평균가']
+
+
+# ============================================================
+# 로딩 (프로세스당 1회)
+# ============================================================
+
+@st.cache_resource(show_spinner=False)
+def _refresh_store() -> dict:
+    """원천 CSV 중 바뀐 월만 Parquet 저장소/집계 큐브에 다시 적재 (프로세스당 1회)"""
+    return data_ingest.ingest(workers=1)
+
+
+def _file_version(path):
+    """(수정 시각, 크기) - 파일은 항상 통째로 교체(atomic_write)되므로 바뀌면 달라짐"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def store_version():
+    """적재 매니페스트 버전 (적재가 끝날 때 큐브/스냅샷 다음에 기록됨)"""
+    _refresh_store()
+    return _file_version(data_ingest.MANIFEST_PATH)
+
+
+def load_auction() -> pd.DataFrame:
+    """경매 통합 테이블 (파일어종/산지/전처리/date/가격 ...)"""
+    return _load_auction(store_version())
+
+
+@st.cache_resource(show_spinner='경매 데이터를 불러오는 중...', max_entries=1)
+def _load_auction(version) -> pd.DataFrame:
+    df = data_ingest.load_store()
+    return df.dropna(subset=['date']).reset_index(drop=True)
+
+
+def load_cube(grain: str = 'monthly') -> pd.DataFrame:
+    """일별/월별 집계 큐브 (data_cube 참고)"""
+    version = store_version()  # 적재가 먼저 끝나야 일별 파일 유무가 확정됨
+    # 월 단위 자료면 'daily' 도 월별 파일 → 같은 캐시 항목을 공유
+    return _load_cube(data_cube.stored_grain(grain), version)
+
+
+@st.cache_resource(show_spinner=False, max_entries=len(data_cube.GRAINS))
+def _load_cube(grain, version) -> pd.DataFrame:
+    return data_cube.load_cube(grain)
+
+
+def load_home_snapshot() -> dict:
+    """홈 화면 집계 스냅샷 (home_snapshot 참고, 적재 시 갱신)"""
+    return _load_home_snapshot(store_version())
+
+
+@st.cache_resource(show_spinner=False, max_entries=1)
+def _load_home_snapshot(version) -> dict:
+    return home_snapshot.load_snapshot()
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def _row_index(column: str, version) -> dict:
+    """컬럼 값 → 행 위치 배열 (접근자가 매번 전체를 훑지 않도록 한 번만 계산)"""
+    return _load_auction(version).groupby(column, sort=False).indices
+
+
+def load_forecasts(engine: str = forecast.DEFAULT_ENGINE) -> pd.DataFrame:
+    """엔진별·파일어종별 5년 예측 테이블 (다른 프로세스가 학습해 파일이 바뀌면 다시 읽음)"""
+    return _load_forecasts(engine, _file_version(forecast.forecast_path(engine)))
+
+
+@st.cache_resource(show_spinner=False, max_entries=len(forecast.ENGINES))
+def _load_forecasts(engine, version) -> pd.DataFrame:
+    return forecast.load_forecasts(engine)
+
+
+@st.cache_resource(show_spinner='학습 데이터를 불러오는 중...')
+def load_ai_table(path: str = AI_DATA_PATH) -> pd.DataFrame:
+    """상세 검색 예측(app_ml2)용 가공 테이블"""
+    return pd.read_csv(path, usecols=AI_COLUMNS)
+
+
+# ============================================================
+# 접근자
+# ============================================================
+
+def _take(column: str, value: str) -> pd.DataFrame:
+    version = store_version()
+    idx = _row_index(column, version).get(value)
+    df = _load_auction(version)
+    if idx is None:
+        return df.iloc[0:0]
+    return df.take(np.sort(idx))
+
+
+def by_species(species: str) -> pd.DataFrame:
+    """파일어종 하나의 거래 행"""
+    return _take('파일어종', species)
+
+
+def by_item(item: str) -> pd.DataFrame:
+    """어종(예: (선)갈치) 하나의 거래 행"""
+    return _take('어종', item)
+
+
+def by_market(market: str) -> pd.DataFrame:
+    """산지 하나의 거래 행"""
+    return _take('산지', market)
+
+
+def rollup(grain: str, by: list, **filters) -> pd.DataFrame:
+    """집계 큐브를 by 차원으로 다시 묶은 결과 (예: rollup('monthly', ['month'], 산지='목포'))"""
+    return data_cube.rollup(load_cube(grain), by, **filters)
+
+
+def forecast_for(species: str, months: int, engine: str = forecast.DEFAULT_ENGINE) -> pd.DataFrame:
+    """미리 계산한 예측 중 학습 구간 + 향후 months 개월 (없으면 빈 DataFrame)"""
+    table = load_forecasts(engine)
+    rows = table[(table['파일어종'] == species) & (table['step'] <= months)]
+    return rows[forecast.FORECAST_COLUMNS].reset_index(drop=True)
+
+
+def date_range() -> tuple:
+    """(첫 거래일, 마지막 거래일)"""
+    dates = load_cube('daily')['date']
+    return dates.min(), dates.max()
+
+
+def species_list() -> list:
+    """파일어종 목록 (가나다순)"""
+    return sorted(load_cube('monthly')['파일어종'].dropna().unique())
+
+
+def market_list() -> list:
+    """산지 목록 (일반 산지 가나다순 → (원양) 산지 가나다순)"""
+    markets = [str(m) for m in load_cube('monthly')['산지'].dropna().unique()]
+    return sorted(m for m in markets if '(원양)' not in m) + sorted(m for m in markets if '(원양)' in m)
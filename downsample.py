@@ -0,0 +1,52 @@
+# ============================================================
+# 📉 긴 시계열 다운샘플링 (Largest-Triangle-Three-Buckets)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 수년치 일별 가격을 그대로 그리면 선 하나에 수천 개 점 → 화면 가로 픽셀보다 많음
+#   - LTTB: 처음/마지막 점은 유지, 나머지를 (threshold - 2)개 구간으로 나누고
+#     구간마다 "직전에 고른 점 - 후보 - 다음 구간 평균" 삼각형 넓이가 가장 큰 점 하나를 고름
+#     → 급등/급락 같은 모양을 보존하면서 점 수를 threshold 로 줄임
+#   - 원본에 있던 점만 고르므로 표시되는 값은 모두 실제 거래 값
+# 사용:
+#   small = downsample.lttb(series, 800)   # DatetimeIndex Series → 최대 800개 점
+# ============================================================
+
+import numpy as np
+
+
+def lttb_indices(x, y, threshold):
+    """LTTB 로 고른 점의 위치 (오름차순 정수 배열, threshold 이상이면 전체)"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+
+    # 가운데 n - 2 개 점을 threshold - 2 개 구간으로 나눔 (경계 edges[i] ~ edges[i + 1])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    picked = np.empty(threshold, dtype=np.int64)
+    picked[0], picked[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 구간 평균 (마지막 구간의 다음은 마지막 점)
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        picked[i + 1] = a
+    return picked
+
+
+def lttb(series, threshold):
+    """DatetimeIndex(또는 숫자 인덱스) Series 를 threshold 개 이하 점으로 축소"""
+    series = series.dropna()
+    if len(series) <= threshold:
+        return series
+    index = series.index
+    if hasattr(index, 'asi8'):
+        x = (index.asi8 - index.asi8[0]) / 8.64e13  # 나노초 → 일
+    else:
+        x = index.to_numpy(dtype='float64')
+    return series.iloc[lttb_indices(x, series.to_numpy(), threshold)]
@@ -0,0 +1,638 @@
+# ============================================================
+# 📈 어종별 월 평균가 예측 모델
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 날짜별 예측 페이지(app_ml)가 요청 중에 모델 학습을 하지 않도록
+#     모든 파일어종 모델을 미리 학습해 models/ 에 저장
+#   - 학습 시 최대 예측 기간(5년)까지 예측해 둔 예측 테이블(models/forecasts_<엔진>.parquet)을
+#     저장 → 페이지는 model.predict 없이 슬라이더 기간만큼 잘라서 사용
+#   - 예측 엔진 선택 (Engine 인터페이스)
+#       prophet  : Prophet (정밀, 학습/예측이 느림)
+#       seasonal : NumPy 추세 + 12개월 계절성 회귀 (전체 어종을 한 번에 벡터화 학습, 수 ms)
+#   - 예측 구간 계산 방식 선택 (Prophet 시뮬레이션 횟수 또는 잔차 분포 기반 구간)
+#   - 학습 데이터 지문/라이브러리 버전을 모델 레지스트리에 기록해 바뀐 어종만 재학습
+#   - 월별 갱신: 새 월이 들어온 어종만 이전 학습 파라미터에서 시작(warm start)해 재학습
+#   - 여러 세션이 같은 어종을 동시에 요청해도 파일 잠금으로 한 번만 학습 (train_species)
+#   - Prophet 모델은 Prophet 공식 JSON 형식(models/model_<어종>.json)으로 저장
+#     (pickle 과 달리 Stan 백엔드/샘플링 결과를 싣지 않아 작고 빨리 읽힘, 예전 .pkl 도 읽음)
+#   - 학습 시계열/모델 경로/학습 설정을 페이지와 배치 학습이 공유
+# 실행:
+#   python forecast.py train                      # 데이터가 바뀐 파일어종만 병렬 학습 (Prophet)
+#   python forecast.py train --engine seasonal    # NumPy 계절성 엔진
+#   python forecast.py train --force              # 전체 재학습
+#   python forecast.py train --species 갈치 고등어 # 일부 어종만
+#   python forecast.py train --workers 4
+#   python forecast.py refresh                    # 새 월이 추가된 어종만 warm start 재학습
+#   python forecast.py compact                    # 예전 model_*.pkl → JSON 변환 + 동일성 검증 + 크기/로드 시간
+# ============================================================
+
+import os
+import re
+import time
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import data_cube
+import data_ingest
+import model_registry
+
+
+MODEL_DIR = 'models'
+
+MAX_YEARS = 5  # 예측 페이지 슬라이더 최대값
+HORIZON = MAX_YEARS * 12
+FORECAST_COLUMNS = ['ds', 'yhat', 'yhat_lower', 'yhat_upper']
+
+# 예측 구간(yhat_lower/yhat_upper) 계산 방식 (Prophet 엔진)
+#   양수: Prophet 불확실성 시뮬레이션 횟수 (Prophet 기본 1000, 줄일수록 빠르지만 경계가 거칠어짐)
+#   0   : 시뮬레이션 없이 학습 구간 잔차 분포의 분위수로 계산 (가장 빠름, 기간에 따라 넓어지지 않음)
+# 비교: python bench.py intervals
+UNCERTAINTY_SAMPLES = 1000
+INTERVAL_WIDTH = 0.8  # Prophet 기본값 (80% 구간)
+
+# 계절성 엔진: 연 주기 푸리에 차수, 정규화한 가격 기준 릿지 계수
+SEASONAL_ORDER = 4
+SEASONAL_RIDGE = 1e-3
+
+DEFAULT_ENGINE = 'prophet'
+
+
+def _safe_name(name):
+    """파일명에 쓸 수 없는 문자는 _ 로 치환"""
+    return re.sub(r"[^0-9a-zA-Z가-힣_]", "_", name)
+
+
+def model_path(species, model_dir=MODEL_DIR, ext='json'):
+    """models/model_<어종>.json (ext='pkl' 은 예전 pickle 형식 경로)"""
+    return os.path.join(model_dir, f'model_{_safe_name(species)}.{ext}')
+
+
+def _train_lock_path(species, engine, model_dir):
+    """어종 학습 잠금 (models/train_<엔진>_<어종>.lock)"""
+    return os.path.join(model_dir, f'train_{engine}_{_safe_name(species)}')
+
+
+def forecast_path(engine=DEFAULT_ENGINE, model_dir=MODEL_DIR):
+    return os.path.join(model_dir, f'forecasts_{engine}.parquet')
+
+
+def _registry_path(model_dir):
+    return os.path.join(model_dir, os.path.basename(model_registry.REGISTRY_PATH))
+
+
+def model_key(species, engine=DEFAULT_ENGINE):
+    """모델 레지스트리 키"""
+    return f'{engine}/{species}'
+
+
+def data_fingerprint(series, engine=DEFAULT_ENGINE):
+    """학습 시계열 + 엔진 설정 지문 (설정이 바뀌어도 예측 테이블을 다시 만듦)"""
+    return model_registry.fingerprint(series, ENGINES[engine].settings())
+
+
+def monthly_series(cube, species):
+    """월별 집계 큐브 → 학습용 (ds: 월말 날짜, y: 월 평균가)"""
+    monthly = data_cube.rollup(cube, ['date'], 파일어종=species)[['date', '평균가']]
+    # resample('M') 과 같은 월말 날짜로 맞춤 (기존 학습 모델과 호환)
+    monthly['date'] = monthly['date'] + pd.offsets.MonthEnd(0)
+    return monthly.rename(columns={'date': 'ds', '평균가': 'y'})
+
+
+def _horizon_table(ds, yhat, lower, upper, months):
+    """예측 테이블 형식으로 정리 (마지막 months 행이 예측 구간)"""
+    table = pd.DataFrame({'ds': pd.to_datetime(ds), 'yhat': yhat, 'yhat_lower': lower, 'yhat_upper': upper})
+    for col in FORECAST_COLUMNS[1:]:
+        table[col] = table[col].astype('float32')
+    history = len(table) - months
+    table['step'] = np.maximum(np.arange(len(table)) - history + 1, 0).astype('int16')
+    return table
+
+
+# ============================================================
+# Prophet
+# ============================================================
+
+def fit_model(series, init=None):
+    """init: warm_start_params(이전 모델) 을 주면 그 값에서 최적화 시작"""
+    # Prophet/cmdstan import 는 무거우므로 실제로 학습할 때만
+    from prophet import Prophet
+
+    model = Prophet(yearly_seasonality=True, weekly_seasonality=False, daily_seasonality=False,
+                    interval_width=INTERVAL_WIDTH)
+    if init is None:
+        model.fit(series)
+    else:
+        model.fit(series, init=init)
+    return model
+
+
+def warm_start_params(model):
+    """학습된 Prophet 모델의 파라미터 → 다음 fit 의 Stan 초기값 (Prophet 문서의 stan_init)"""
+    params = {name: model.params[name][0][0] for name in ['k', 'm', 'sigma_obs']}
+    params.update({name: model.params[name][0] for name in ['delta', 'beta']})
+    return params
+
+
+def save_prophet(model, path):
+    """Prophet 모델 → JSON (prophet.serialize, 임시 파일 후 교체)"""
+    from prophet.serialize import model_to_json
+
+    text = model_to_json(model)
+
+    def _write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    model_registry.atomic_write(path, _write)
+
+
+def load_prophet(path):
+    """저장된 Prophet 모델 (.json, 예전 .pkl 도 지원)"""
+    if path.endswith('.pkl'):
+        return joblib.load(path)
+    from prophet.serialize import model_from_json
+
+    with open(path, encoding='utf-8') as f:
+        return model_from_json(f.read())
+
+
+def residual_bands(model, yhat):
+    """학습 구간 잔차(실제 - 예측)의 분위수를 yhat 에 더한 (하한, 상한)"""
+    history = len(model.history)
+    residuals = model.history['y'].to_numpy() - np.asarray(yhat[:history])
+    width = model.interval_width
+    low, high = np.quantile(residuals, [(1 - width) / 2, (1 + width) / 2])
+    return yhat + low, yhat + high
+
+
+def predict_horizon(model, months=HORIZON, samples=UNCERTAINTY_SAMPLES):
+    """학습 구간 + 향후 months 개월 예측 (step: 0 = 학습 구간, 1.. = 예측 개월 수)
+
+    samples: 예측 구간 시뮬레이션 횟수 (0 이면 residual_bands)
+    """
+    future = model.make_future_dataframe(periods=months, freq='ME')
+    model.uncertainty_samples = samples
+    pred = model.predict(future)
+    yhat = pred['yhat'].to_numpy()
+    if samples:
+        lower, upper = pred['yhat_lower'].to_numpy(), pred['yhat_upper'].to_numpy()
+    else:
+        lower, upper = residual_bands(model, yhat)
+    return _horizon_table(pred['ds'], yhat, lower, upper, months)
+
+
+# ============================================================
+# NumPy 계절성 모델 (추세 + 연 주기 푸리에 항, 잔차 분위수 구간)
+# ============================================================
+
+def _month_number(ds):
+    """날짜 → 절대 월 번호 (year * 12 + month - 1)"""
+    ds = pd.DatetimeIndex(ds)
+    return np.asarray(ds.year * 12 + ds.month - 1, dtype='int64')
+
+
+def _seasonal_design(months, origin, order=SEASONAL_ORDER):
+    """[1, 경과 연수, cos/sin(2πk·월/12) k=1..order] 설계 행렬"""
+    months = np.asarray(months, dtype='float64')
+    angle = 2 * np.pi * months[:, None] * np.arange(1, order + 1) / 12
+    years = (months - origin) / 12
+    return np.column_stack([np.ones_like(months), years, np.cos(angle), np.sin(angle)])
+
+
+def fit_seasonal(series_by_species, order=SEASONAL_ORDER, ridge=SEASONAL_RIDGE, width=INTERVAL_WIDTH):
+    """{파일어종: 학습 시계열} → {파일어종: 모델 dict}
+
+    전체 어종을 (어종 × 월) 행렬로 쌓아 결측 마스크를 가중치로 한 정규방정식을
+    한 번에 풀고, 잔차 분위수도 한 번에 계산한다.
+    """
+    names = list(series_by_species)
+    numbers = [_month_number(series_by_species[n]['ds']) for n in names]
+    origin = min(int(m.min()) for m in numbers)
+    span = max(int(m.max()) for m in numbers) - origin + 1
+
+    y = np.full((len(names), span), np.nan)
+    for i, (name, m) in enumerate(zip(names, numbers)):
+        y[i, m - origin] = series_by_species[name]['y'].to_numpy(dtype='float64')
+    mask = ~np.isnan(y)
+    scale = np.nanmean(np.abs(y), axis=1)
+    scale[~(scale > 0)] = 1.0
+    z = np.where(mask, y / scale[:, None], 0.0)
+
+    x = _seasonal_design(np.arange(origin, origin + span), origin, order)
+    w = mask.astype('float64')
+    xtx = np.einsum('st,tp,tq->spq', w, x, x)
+    xtx += ridge * np.eye(x.shape[1])
+    xtz = np.einsum('st,tp->sp', w * z, x)
+    coef = np.linalg.solve(xtx, xtz[:, :, None])[:, :, 0] * scale[:, None]
+
+    residuals = np.where(mask, y - coef @ x.T, np.nan)
+    low, high = np.nanquantile(residuals, [(1 - width) / 2, (1 + width) / 2], axis=1)
+
+    return {
+        name: {'coef': coef[i], 'origin': origin, 'order': order, 'ds': series_by_species[name]['ds'].to_numpy(),
+               'low': float(low[i]), 'high': float(high[i])}
+        for i, name in enumerate(names)
+    }
+
+
+def predict_seasonal(model, months=HORIZON):
+    last = pd.Timestamp(model['ds'][-1])
+    future = pd.date_range(last, periods=months + 1, freq='ME')[1:]
+    ds = np.concatenate([model['ds'], future.to_numpy()])
+    x = _seasonal_design(_month_number(ds), model['origin'], model['order'])
+    yhat = x @ model['coef']
+    return _horizon_table(ds, yhat, yhat + model['low'], yhat + model['high'], months)
+
+
+# ============================================================
+# 예측 엔진
+# ============================================================
+
+class Engine:
+    """예측 엔진 공통 인터페이스
+
+    fit(series) → 모델, predict(model, months) → 예측 테이블 (_horizon_table 형식)
+    vectorized 엔진은 fit_many 로 전체 어종을 한 번에 학습 (프로세스 풀 미사용)
+    """
+    name = None
+    label = None
+    libraries = ()  # 산출물 호환성에 영향을 주는 라이브러리 (버전이 바뀌면 재학습)
+    vectorized = False
+
+    def settings(self):
+        return {}
+
+    def fit(self, series):
+        raise NotImplementedError
+
+    def fit_many(self, series_by_species):
+        return {name: self.fit(series) for name, series in series_by_species.items()}
+
+    def refit(self, previous, series):
+        """이전 모델에서 시작하는 재학습 (warm start 를 지원하지 않으면 새로 학습)"""
+        return self.fit(series)
+
+    def predict(self, model, months=HORIZON):
+        raise NotImplementedError
+
+    def save(self, model, species, model_dir=MODEL_DIR):
+        """모델 파일 저장 후 경로 반환 (None 이면 예측 테이블만 보관)"""
+        return None
+
+    def load(self, species, model_dir=MODEL_DIR):
+        """저장된 모델 (없거나 읽을 수 없으면 None)"""
+        return None
+
+
+class ProphetEngine(Engine):
+    name = 'prophet'
+    label = '정밀 예측 (Prophet)'
+    libraries = ('prophet', 'cmdstanpy', 'pandas')
+
+    def settings(self):
+        return {'uncertainty_samples': UNCERTAINTY_SAMPLES, 'interval_width': INTERVAL_WIDTH}
+
+    def fit(self, series):
+        return fit_model(series)
+
+    def refit(self, previous, series):
+        return fit_model(series, init=warm_start_params(previous))
+
+    def predict(self, model, months=HORIZON):
+        return predict_horizon(model, months)
+
+    def save(self, model, species, model_dir=MODEL_DIR):
+        path = model_path(species, model_dir)
+        save_prophet(model, path)
+        return path
+
+    def load(self, species, model_dir=MODEL_DIR):
+        for ext in ('json', 'pkl'):
+            path = model_path(species, model_dir, ext)
+            if not os.path.exists(path):
+                continue
+            try:
+                return load_prophet(path)
+            except Exception:
+                continue
+        return None
+
+
+class SeasonalEngine(Engine):
+    name = 'seasonal'
+    label = '빠른 예측 (추세 + 계절성)'
+    libraries = ('numpy', 'pandas')
+    vectorized = True
+
+    def settings(self):
+        return {'order': SEASONAL_ORDER, 'ridge': SEASONAL_RIDGE, 'interval_width': INTERVAL_WIDTH}
+
+    def fit(self, series):
+        return self.fit_many({None: series})[None]
+
+    def fit_many(self, series_by_species):
+        return fit_seasonal(series_by_species)
+
+    def predict(self, model, months=HORIZON):
+        return predict_seasonal(model, months)
+
+
+ENGINES = {engine.name: engine for engine in (ProphetEngine(), SeasonalEngine())}
+
+
+# ============================================================
+# 예측 테이블
+# ============================================================
+
+def load_forecasts(engine=DEFAULT_ENGINE, model_dir=MODEL_DIR):
+    """엔진별 전체 예측 테이블 (파일어종 + FORECAST_COLUMNS + step), 없으면 빈 테이블"""
+    path = forecast_path(engine, model_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['파일어종'] + FORECAST_COLUMNS + ['step'])
+    return pd.read_parquet(path)
+
+
+def save_forecasts(tables, engine=DEFAULT_ENGINE, model_dir=MODEL_DIR):
+    """{파일어종: 예측 테이블} 을 엔진별 예측 테이블에 반영 (해당 어종만 교체, 임시 파일 후 교체)
+
+    읽기-병합-쓰기를 잠금 안에서 해서 동시에 학습한 다른 프로세스의 어종이 사라지지 않음
+    """
+    if not tables:
+        return
+    path = forecast_path(engine, model_dir)
+    with model_registry.file_lock(path):
+        current = load_forecasts(engine, model_dir)
+        current = current[~current['파일어종'].isin(list(tables))]
+        frames = [t.assign(파일어종=name) for name, t in tables.items()]
+        if len(current):
+            frames.insert(0, current)
+        table = pd.concat(frames, ignore_index=True)
+        table = table[['파일어종'] + FORECAST_COLUMNS + ['step']].sort_values(['파일어종', 'ds'], kind='stable')
+        model_registry.atomic_write(path, lambda tmp_path: table.to_parquet(tmp_path, index=False))
+
+
+# ============================================================
+# 배치 학습
+# ============================================================
+
+def _metrics(series, table):
+    fitted = table[table['step'] == 0]
+    return model_registry.regression_metrics(series['y'].to_numpy(), fitted['yhat'].to_numpy())
+
+
+def _fit(engine, species, series, model_dir, warm_start):
+    """warm_start 면 저장된 이전 모델에서 시작해 재학습, 실패하거나 이전 모델이 없으면 새로 학습
+    → (모델, 'warm' / 'cold')
+    """
+    previous = engine.load(species, model_dir) if warm_start else None
+    if previous is not None:
+        try:
+            return engine.refit(previous, series), 'warm'
+        except Exception:
+            pass  # 파라미터 모양이 달라진 경우 등 → 새로 학습
+    return engine.fit(series), 'cold'
+
+
+def _train_one(task):
+    """워커: 어종 하나 학습·저장 후 5년 예측
+    → (어종, 학습 행 수, 학습 시간, 오류, 예측 테이블, 성능 요약, 모델 파일, 학습 방식)
+    """
+    engine_name, species, series, model_dir, warm_start = task
+    engine = ENGINES[engine_name]
+    logging.getLogger('cmdstanpy').setLevel(logging.WARNING)
+    start = time.perf_counter()
+    try:
+        model, mode = _fit(engine, species, series, model_dir, warm_start)
+        elapsed = time.perf_counter() - start
+        # 모델 파일/예측 테이블 모두 임시 파일에 쓴 뒤 교체 (읽는 쪽은 이전 것 또는 새 것만 봄)
+        artifact = engine.save(model, species, model_dir)
+        table = engine.predict(model)
+    except Exception as e:
+        return species, len(series), time.perf_counter() - start, f'{type(e).__name__}: {e}', None, None, None, None
+    return species, len(series), elapsed, None, table, _metrics(series, table), artifact, mode
+
+
+def _train_vectorized(engine, series_by_species, model_dir):
+    """벡터화 엔진: 전체 어종 한 번에 학습 (어종별 학습 시간은 전체 시간을 균등 배분)"""
+    start = time.perf_counter()
+    try:
+        models = engine.fit_many(series_by_species)
+        elapsed = (time.perf_counter() - start) / max(len(series_by_species), 1)
+        tables = {name: engine.predict(model) for name, model in models.items()}
+    except Exception as e:
+        error = f'{type(e).__name__}: {e}'
+        elapsed = time.perf_counter() - start
+        return [(name, len(s), elapsed, error, None, None, None, None) for name, s in series_by_species.items()]
+    return [(name, len(s), elapsed, None, tables[name], _metrics(s, tables[name]),
+             engine.save(models[name], name, model_dir), 'cold')
+            for name, s in series_by_species.items()]
+
+
+def _commit(results, series_by_species, engine, model_dir):
+    """학습 결과를 예측 테이블과 모델 레지스트리에 반영"""
+    tables, entries = {}, {}
+    for name, _, elapsed, error, table, metrics, artifact, _ in results:
+        if error:
+            continue
+        tables[name] = table
+        entries[model_key(name, engine.name)] = model_registry.make_entry(
+            artifact or forecast_path(engine.name, model_dir),
+            data_fingerprint(series_by_species[name], engine.name), engine.libraries, elapsed, metrics)
+    save_forecasts(tables, engine.name, model_dir)
+    model_registry.record(entries, _registry_path(model_dir))
+
+
+def _train(series_by_species, engine, workers, model_dir, on_result=None, warm_start=False):
+    """엔진에 맞게 학습 (벡터화 엔진은 한 번에, 그 외는 프로세스 풀) 후 결과 반영"""
+    if not series_by_species:
+        return []
+    if engine.vectorized:
+        results = _train_vectorized(engine, series_by_species, model_dir)
+        for result in results:
+            if on_result:
+                on_result(result)
+    else:
+        tasks = [(engine.name, name, series, model_dir, warm_start) for name, series in series_by_species.items()]
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        results = []
+        if workers <= 1:
+            for task in tasks:
+                results.append(_train_one(task))
+                if on_result:
+                    on_result(results[-1])
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for future in as_completed([executor.submit(_train_one, t) for t in tasks]):
+                    results.append(future.result())
+                    if on_result:
+                        on_result(results[-1])
+    _commit(results, series_by_species, engine, model_dir)
+    return results
+
+
+def is_current(species, series, engine=DEFAULT_ENGINE, model_dir=MODEL_DIR):
+    """레지스트리 기준으로 모델이 최신이고 예측 테이블에도 있으면 True"""
+    key = model_key(species, engine)
+    if not model_registry.is_current(key, data_fingerprint(series, engine), ENGINES[engine].libraries,
+                                     _registry_path(model_dir)):
+        return False
+    table = load_forecasts(engine, model_dir)
+    return bool((table['파일어종'] == species).any())
+
+
+def train_species(species, series, engine=DEFAULT_ENGINE, model_dir=MODEL_DIR, warm_start=True):
+    """어종 하나를 현재 프로세스에서 학습해 모델/예측 테이블/레지스트리 갱신 (실패 시 오류 문자열)
+
+    warm_start: 저장된 이전 모델이 있으면 그 파라미터에서 시작
+    같은 (엔진, 어종) 학습은 프로세스 간 잠금으로 한 번에 하나만 실행하고, 기다리는 동안
+    다른 세션이 학습을 끝내 이미 최신이면 다시 학습하지 않음
+    """
+    with model_registry.file_lock(_train_lock_path(species, engine, model_dir)):
+        if is_current(species, series, engine, model_dir):
+            return None
+        results = _train({species: series}, ENGINES[engine], 1, model_dir, warm_start=warm_start)
+    return results[0][3]
+
+
+def train_all(species=None, engine=DEFAULT_ENGINE, workers=None, model_dir=MODEL_DIR, force=False,
+              warm_start=False, verbose=True):
+    """파일어종별 예측 모델을 학습해 model_dir 에 저장하고 5년 예측을 예측 테이블
+    (model_dir/forecasts_<엔진>.parquet)에, 학습 정보를 레지스트리에 반영
+
+    species : 학습할 파일어종 목록 (기본: 집계 큐브의 전체 파일어종)
+    engine  : ENGINES 키 (prophet 은 프로세스 풀, seasonal 은 전체 어종 한 번에)
+    force   : False 면 학습 데이터/라이브러리 버전이 레지스트리와 같은 어종은 건너뜀
+    warm_start : True 면 저장된 이전 모델 파라미터에서 시작 (월별 갱신용, refresh 참고)
+    반환    : [(어종, 학습 행 수, 학습 시간(초), 오류 또는 None), ...] (건너뛴 어종 제외)
+    """
+    data_ingest.ingest(workers=1)
+    cube = data_cube.load_cube('monthly')
+    if species is None:
+        species = sorted(cube['파일어종'].dropna().unique())
+
+    os.makedirs(model_dir, exist_ok=True)
+    pending, added = {}, {}
+    for name in species:
+        series = monthly_series(cube, name)
+        if len(series) < 2:
+            if verbose:
+                print(f'  건너뜀: {name} (학습 데이터 {len(series)}개월)')
+            continue
+        if not force and is_current(name, series, engine, model_dir):
+            if verbose:
+                print(f'  최신: {name}')
+            continue
+        pending[name] = series
+        added[name] = _new_months(name, series, engine, model_dir)
+
+    def _report(result):
+        name, rows, elapsed, error, mode = result[0], result[1], result[2], result[3], result[7]
+        status = '실패: ' + error if error else f'완료 ({mode})'
+        new = f' (+{added[name]})' if added[name] else ''
+        print(f'  {name}: {rows}개월{new}, {elapsed:.3f}s {status}')
+
+    results = _train(pending, ENGINES[engine], workers, model_dir, _report if verbose else None, warm_start)
+    return sorted(r[:4] for r in results)
+
+
+def _new_months(species, series, engine, model_dir):
+    """예측 테이블의 마지막 학습월 이후 새로 들어온 개월 수 (이전 학습이 없으면 0)"""
+    table = load_forecasts(engine, model_dir)
+    history = table.loc[(table['파일어종'] == species) & (table['step'] == 0), 'ds']
+    if history.empty:
+        return 0
+    return int((series['ds'] > history.max()).sum())
+
+
+def refresh(engine=DEFAULT_ENGINE, workers=None, model_dir=MODEL_DIR, verbose=True):
+    """월별 갱신: 데이터가 바뀐(새 월이 들어온) 어종만 이전 학습 파라미터에서 시작해 재학습하고
+    모델 파일/예측 테이블/레지스트리를 교체 (모두 임시 파일에 쓴 뒤 os.replace)"""
+    return train_all(engine=engine, workers=workers, model_dir=model_dir, warm_start=True, verbose=verbose)
+
+
+def compact(model_dir=MODEL_DIR, verbose=True):
+    """예전 pickle 모델(model_*.pkl)을 JSON 으로 변환
+
+    변환 전후 학습 구간 + 5년 예측(잔차 구간, 시뮬레이션 없음)이 같을 때만 레지스트리의
+    모델 경로를 JSON 으로 바꾸고, 다르면 JSON 을 지움 (pickle 은 그대로 둠)
+    반환: [(pickle 경로, pickle 크기, pickle 로드 시간, JSON 크기, JSON 로드 시간, 동일 여부), ...]
+    """
+    registry_path = _registry_path(model_dir)
+    results, moved = [], {}
+    for name in sorted(os.listdir(model_dir)):
+        if not (name.startswith('model_') and name.endswith('.pkl')):
+            continue
+        pkl_path = os.path.join(model_dir, name)
+        json_path = pkl_path[:-len('.pkl')] + '.json'
+
+        start = time.perf_counter()
+        model = load_prophet(pkl_path)
+        pkl_load = time.perf_counter() - start
+        save_prophet(model, json_path)
+        start = time.perf_counter()
+        restored = load_prophet(json_path)
+        json_load = time.perf_counter() - start
+
+        before, after = predict_horizon(model, samples=0), predict_horizon(restored, samples=0)
+        params, restored_params = warm_start_params(model), warm_start_params(restored)
+        same = before.equals(after) and all(np.array_equal(params[k], restored_params[k]) for k in params)
+        if same:
+            for key, entry in model_registry.load_registry(registry_path).items():
+                if entry.get('artifact') == pkl_path:
+                    moved[key] = dict(entry, artifact=json_path)
+        else:
+            os.remove(json_path)
+        results.append((pkl_path, os.path.getsize(pkl_path), pkl_load,
+                        os.path.getsize(json_path) if same else None, json_load, same))
+        if verbose:
+            size = f'{results[-1][3] / 1e3:,.0f}KB' if same else '-'
+            print(f'  {name}: {results[-1][1] / 1e3:,.0f}KB / {pkl_load * 1000:,.0f}ms → '
+                  f'{size} / {json_load * 1000:,.0f}ms ({"동일" if same else "불일치, 변환 안 함"})')
+    model_registry.record(moved, registry_path)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='어종별 월 평균가 예측 모델')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('train', help='파일어종별 예측 모델 배치 학습 (models/)')
+    p.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE)
+    p.add_argument('--species', nargs='+', default=None, help='학습할 파일어종 (기본: 전체)')
+    p.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수 (기본: CPU 코어 수)')
+    p.add_argument('--force', action='store_true', help='레지스트리와 무관하게 전체 재학습')
+
+    p = sub.add_parser('refresh', help='새 월이 추가된 어종만 이전 모델에서 시작해 재학습')
+    p.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE)
+    p.add_argument('--workers', type=int, default=None, help='병렬 프로세스 수 (기본: CPU 코어 수)')
+
+    sub.add_parser('compact', help='예전 Prophet pickle 모델을 JSON 으로 변환 (동일성 검증)')
+
+    args = parser.parse_args()
+    if args.command == 'compact':
+        results = compact()
+        converted = [r for r in results if r[5]]
+        if converted:
+            print(f'변환 {len(converted)}개 / {len(results)}개: '
+                  f'{sum(r[1] for r in converted) / 1e6:,.1f}MB → {sum(r[3] for r in converted) / 1e6:,.1f}MB, '
+                  f'로드 {sum(r[2] for r in converted):.2f}s → {sum(r[4] for r in converted):.2f}s')
+    if args.command in ('train', 'refresh'):
+        start = time.perf_counter()
+        if args.command == 'train':
+            results = train_all(species=args.species, engine=args.engine, workers=args.workers, force=args.force)
+        else:
+            results = refresh(engine=args.engine, workers=args.workers)
+        wall = time.perf_counter() - start
+        failed = [r for r in results if r[3]]
+        fit_total = sum(r[2] for r in results)
+        print(f'[{args.engine}] 학습 {len(results) - len(failed)}개 / 실패 {len(failed)}개 '
+              f'/ 학습 시간 합계 {fit_total:.3f}s / 전체 소요 {wall:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
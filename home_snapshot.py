@@ -0,0 +1,84 @@
+# ============================================================
+# 🏠 홈 화면 집계 스냅샷 (data/cube/home.json)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 홈 화면(app_home)이 방문마다 계산하던 집계를 적재 시점에 한 번만 계산해 저장
+#       주요 지표 (등록 어종 수, 거래 산지 수)
+#       최근 7일 거래 건수 상위 6개 어종과 각 어종의 최근 30일 일별 평균가
+#       어종별 최저 평균가 월 (제철 어종 추천, seasonal.best_months)
+#   - 모두 데이터에만 의존 (기준일 = 데이터의 마지막 거래일)
+#     → 집계 큐브를 다시 만들 때(data_ingest.ingest) 함께 갱신
+#     제철 추천에서 보여 줄 달(저번/이번/다음 달)만 화면에서 오늘 날짜로 고름
+# ============================================================
+
+import os
+import json
+import datetime
+
+import pandas as pd
+
+import data_cube
+import model_registry
+import seasonal
+
+
+SNAPSHOT_NAME = 'home.json'
+TOP_SPECIES = 6      # 최근 가격 추이 차트 수
+TOP_DAYS = 7         # 상위 어종 선정 기간 (일)
+CHART_DAYS = 30      # 차트 기간 (일)
+
+
+def snapshot_path(cube_dir=data_cube.CUBE_DIR):
+    return os.path.join(cube_dir, SNAPSHOT_NAME)
+
+
+def build_snapshot(cubes):
+    """{'daily': 큐브, 'monthly': 큐브} → JSON 으로 저장할 dict"""
+    daily, monthly = cubes['daily'], cubes['monthly']
+    today = daily['date'].max()
+
+    # 최근 7일간 거래량이 많은 어종 + 최근 30일 일별 평균가
+    recent = data_cube.rollup(daily[daily['date'] >= (today - pd.Timedelta(days=TOP_DAYS))], ['파일어종'])
+    top_species = recent.sort_values('count', ascending=False, kind='stable').head(TOP_SPECIES)['파일어종'].tolist()
+    last_days = daily[daily['date'] >= (today - pd.Timedelta(days=CHART_DAYS))]
+    charts = []
+    for species in top_species:
+        series = data_cube.rollup(last_days, ['date'], 파일어종=species)
+        charts.append({
+            'species': species,
+            'date': series['date'].dt.strftime('%Y-%m-%d').tolist(),
+            '평균가': series['평균가'].astype(float).tolist(),
+        })
+
+    # 어종별 최저가 기준 제철 판단
+    best = seasonal.best_months(monthly)
+
+    return {
+        'built_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'today': today.strftime('%Y-%m-%d'),
+        'total_species': int(daily['파일어종'].nunique()),
+        'total_sources': int(daily['산지'].nunique()),
+        'charts': charts,
+        'seasonal': best[seasonal.COLUMNS].values.tolist(),
+    }
+
+
+def save_snapshot(snapshot, cube_dir=data_cube.CUBE_DIR):
+    """고유한 임시 파일에 쓴 뒤 교체 (model_registry.atomic_write)"""
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(snapshot, f, ensure_ascii=False)
+
+    model_registry.atomic_write(snapshot_path(cube_dir), write)
+
+
+def load_snapshot(cube_dir=data_cube.CUBE_DIR):
+    """저장된 스냅샷 → charts 는 [(어종, DataFrame[date, 평균가]), ...], seasonal 은 달 인덱스(seasonal.index_by_month)"""
+    with open(snapshot_path(cube_dir), encoding='utf-8') as f:
+        snapshot = json.load(f)
+    snapshot['charts'] = [
+        (chart['species'], pd.DataFrame({'date': pd.to_datetime(chart['date']), '평균가': chart['평균가']}))
+        for chart in snapshot['charts']
+    ]
+    snapshot['seasonal'] = seasonal.index_by_month(pd.DataFrame(snapshot['seasonal'], columns=seasonal.COLUMNS))
+    return snapshot
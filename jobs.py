@@ -0,0 +1,128 @@
+# ============================================================
+# 🧵 백그라운드 학습 작업 큐 (서버 프로세스 공용)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 페이지 요청(스크립트 스레드) 안에서 모델을 학습하지 않고 작업 큐에 맡김
+#   - 같은 key 의 작업이 대기/실행 중이면 새로 만들지 않고 기존 작업을 돌려줌 (중복 제거)
+#   - 작업은 세션과 무관하게 프로세스에 남으므로 브라우저를 새로고침해도 진행 상황 유지
+#   - progress_widget 으로 진행률/상태를 보여 주고 끝나면 페이지를 다시 실행
+# 사용:
+#   job = jobs.submit('prophet/갈치', train_func, species, ..., label='갈치 예측 모델 학습')
+#   train_func(report, *args) 의 report(비율, 메시지) 로 진행률 보고
+# ============================================================
+
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+
+MAX_WORKERS = 2  # 동시에 학습할 작업 수 (Prophet/cmdstan, RandomForest 는 내부에서도 병렬)
+KEEP_FINISHED = 50  # 보관할 완료 작업 수
+
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+STATUS_LABELS = {QUEUED: '대기 중', RUNNING: '진행 중', DONE: '완료', FAILED: '실패'}
+
+
+class Job:
+    """학습 작업 하나의 상태 (여러 세션/스레드가 읽으므로 갱신은 report/_finish 로만)"""
+
+    def __init__(self, key, label):
+        self.key = key
+        self.label = label or key
+        self.status = QUEUED
+        self.progress = 0.0
+        self.message = STATUS_LABELS[QUEUED]
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    def report(self, progress, message=None):
+        """작업 함수가 진행률(0~1)과 메시지를 보고"""
+        self.progress = min(max(float(progress), 0.0), 1.0)
+        if message:
+            self.message = message
+
+    def _run(self, func, args, kwargs):
+        self.status, self.started_at = RUNNING, time.time()
+        self.report(0.0, STATUS_LABELS[RUNNING])
+        try:
+            result, error = func(self.report, *args, **kwargs), None
+        except Exception as e:
+            result, error = None, f'{type(e).__name__}: {e}'
+        # 완료 시각 → 상태 순으로 잠금 안에서 기록 (submit 의 _prune 이 완료 시각 없는 완료 작업을 보지 않도록)
+        with _lock:
+            self.finished_at = time.time()
+            self.result, self.error = result, error
+            if error is None:
+                self.report(1.0, STATUS_LABELS[DONE])
+                self.status = DONE
+            else:
+                self.message = error
+                self.status = FAILED
+
+
+_lock = threading.Lock()
+_jobs = {}  # key → 가장 최근 Job
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='train-job')
+    return _executor
+
+
+def submit(key, func, *args, label=None, **kwargs):
+    """학습 작업 등록 (같은 key 가 대기/실행 중이면 그 작업을 그대로 반환)"""
+    with _lock:
+        job = _jobs.get(key)
+        if job is not None and not job.finished:
+            return job
+        job = Job(key, label)
+        _jobs[key] = job
+        _prune()
+        _get_executor().submit(job._run, func, args, kwargs)
+        return job
+
+
+def get(key):
+    """key 의 가장 최근 작업 (없으면 None)"""
+    with _lock:
+        return _jobs.get(key)
+
+
+def all_jobs():
+    with _lock:
+        return sorted(_jobs.values(), key=lambda j: j.submitted_at)
+
+
+def _prune():
+    finished = sorted((j for j in _jobs.values() if j.finished and j.finished_at is not None),
+                      key=lambda j: j.finished_at)
+    for job in finished[:max(len(finished) - KEEP_FINISHED, 0)]:
+        del _jobs[job.key]
+
+
+# ============================================================
+# 화면 표시
+# ============================================================
+
+def progress_widget(job, interval=1.0):
+    """진행률/상태 표시, 작업이 끝나면 페이지 전체를 다시 실행해 결과를 반영"""
+    @st.fragment(run_every=interval)
+    def _poll():
+        elapsed = time.time() - (job.started_at or job.submitted_at)
+        st.progress(job.progress, text=f'{job.label} · {job.message} ({elapsed:.0f}초)')
+        if job.finished:
+            st.rerun()
+
+    _poll()
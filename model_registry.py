@@ -0,0 +1,188 @@
+# ============================================================
+# 🗂 학습 모델 레지스트리 (models/registry.json)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 모델 파일(models/*.pkl, pipe.pkl)마다 학습 데이터 지문, 라이브러리 버전,
+#     학습 시간, 성능 요약을 기록
+#   - 데이터나 라이브러리 버전이 바뀐 모델만 다시 학습 (파일을 지우지 않아도 됨)
+#   - 여러 세션/프로세스가 같은 모델을 동시에 학습하거나 쓰지 않도록 파일 잠금(file_lock),
+#     모델/레지스트리 파일은 고유한 임시 파일에 쓴 뒤 교체(atomic_write)
+# 항목 예:
+#   "prophet/갈치": {"artifact": "models/model_갈치.pkl", "fingerprint": "…",
+#                    "libraries": {"prophet": "1.1.5"}, "fit_seconds": 1.8,
+#                    "metrics": {"n": 48, "train_mae": …}, "trained_at": "…"}
+# ============================================================
+
+import os
+import json
+import time
+import hashlib
+import datetime
+import tempfile
+import contextlib
+from importlib import metadata
+
+import numpy as np
+import pandas as pd
+import joblib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+REGISTRY_PATH = os.path.join('models', 'registry.json')
+
+LOCK_TIMEOUT = 600  # 잠금 대기 최대 시간 (초, 다른 세션의 학습이 끝나기를 기다림)
+LOCK_POLL = 0.2
+
+
+def fingerprint(df, settings=None):
+    """학습 데이터 지문 (컬럼명 + 행 값 해시, 행 순서 포함)
+
+    settings: 산출물에 영향을 주는 설정 dict (바뀌면 지문도 바뀜)
+    """
+    h = hashlib.sha1('|'.join(map(str, df.columns)).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    if settings:
+        h.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+
+def library_versions(packages):
+    """{패키지: 설치 버전} (설치되지 않은 패키지는 None)"""
+    versions = {}
+    for name in packages:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def regression_metrics(y_true, y_pred):
+    """성능 요약 (학습 데이터 기준 MAE/MAPE)"""
+    y_true = np.asarray(y_true, dtype='float64')
+    y_pred = np.asarray(y_pred, dtype='float64')
+    err = np.abs(y_true - y_pred)
+    nonzero = y_true != 0
+    return {
+        'n': int(len(y_true)),
+        'train_mae': round(float(err.mean()), 2) if len(err) else None,
+        'train_mape': round(float((err[nonzero] / np.abs(y_true[nonzero])).mean() * 100), 2) if nonzero.any() else None,
+    }
+
+
+# ============================================================
+# 잠금 / 원자적 쓰기
+# ============================================================
+
+@contextlib.contextmanager
+def file_lock(path, timeout=LOCK_TIMEOUT):
+    """path + '.lock' 파일에 대한 프로세스 간 배타 잠금 (같은 프로세스의 다른 스레드도 대기)
+
+    timeout 초 안에 잠금을 얻지 못하면 TimeoutError
+    """
+    lock_path = path + '.lock'
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                break
+            except OSError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f'잠금 대기 시간 초과: {lock_path}')
+                time.sleep(LOCK_POLL)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path, write):
+    """write(임시 경로) 로 같은 폴더의 고유한 임시 파일에 쓴 뒤 os.replace 로 교체
+
+    동시에 쓰는 프로세스끼리 임시 파일이 겹치지 않고, 읽는 쪽은 항상 완성된 파일만 봄
+    임시 파일 이름은 '.' 으로 시작 (Parquet 폴더를 통째로 읽는 pyarrow 가 쓰는 중인 파일을 건너뜀)
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+
+# ============================================================
+# 레지스트리 파일
+# ============================================================
+
+def load_registry(path=REGISTRY_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_registry(registry, path=REGISTRY_PATH):
+    def _write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(registry, f, ensure_ascii=False, indent=1, sort_keys=True)
+
+    atomic_write(path, _write)
+
+
+def make_entry(artifact, fingerprint, libraries, fit_seconds, metrics):
+    return {
+        'artifact': artifact,
+        'fingerprint': fingerprint,
+        'libraries': library_versions(libraries),
+        'fit_seconds': round(float(fit_seconds), 3),
+        'metrics': metrics,
+        'trained_at': datetime.datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def record(entries, path=REGISTRY_PATH):
+    """{키: make_entry(...)} 를 레지스트리에 반영 (읽기-수정-쓰기를 잠금 안에서, 다른 프로세스 기록 유지)"""
+    if not entries:
+        return
+    with file_lock(path):
+        registry = load_registry(path)
+        registry.update(entries)
+        save_registry(registry, path)
+
+
+def is_current(key, fingerprint, libraries, path=REGISTRY_PATH):
+    """모델 파일이 있고 학습 데이터 지문/라이브러리 버전이 기록과 같으면 True"""
+    entry = load_registry(path).get(key)
+    if not entry or not os.path.exists(entry.get('artifact', '')):
+        return False
+    return entry.get('fingerprint') == fingerprint and entry.get('libraries') == library_versions(libraries)
+
+
+def save_artifact(obj, path):
+    """모델 파일을 고유한 임시 파일에 쓴 뒤 교체"""
+    atomic_write(path, lambda tmp_path: joblib.dump(obj, tmp_path))
@@ -0,0 +1,560 @@
+# ============================================================
+# 💰 상세 검색 예측 (거래 조건별 평균가) 예측 도우미
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 상세 검색 예측(app_ml2)의 파이프라인(전처리 'pre' + 랜덤 포레스트) 예측값과
+#     예측 구간(5~95%)을 한 번에 계산
+#   - 예전: 트리 200개마다 입력을 다시 전처리하고 est.predict 를 파이썬 루프로 호출
+#   - 지금: 입력은 한 번만 전처리, model.apply 로 전체 트리의 리프 번호를 한 번에 구한 뒤
+#           미리 펼쳐 둔 리프 값 테이블에서 인덱싱 → 트리별 예측 행렬 → 분위수
+#     (결과는 트리별 est.predict 와 같음, 리프 값 테이블은 모델당 1회 생성)
+#   - 학습 파이프라인 종류 선택 (PIPE_MODEL)
+#       rf  : 원-핫(밀집) + 랜덤 포레스트, 학습 데이터 일부 표본 (기존)
+#       hgb : 순서형 인코딩(네이티브 범주) + 히스토그램 그래디언트 부스팅, 전체 데이터 학습
+#   - 구매 목록(거래 조건 여러 행)을 한 번에 예측하는 일괄 예측 (predict_batch)
+#   - 예측 조회표 (PriceLookup): 범주 조건 전체 조합 × 수량/중량 격자점의 예측값/구간을
+#     미리 계산해 두고 조회 시 격자 사이를 보간 → 페이지가 랜덤 포레스트를 불러오지 않고 응답
+#   - 압축 포레스트 (CompactForest): 랜덤 포레스트의 예측에 필요한 노드 배열만 배열별 .npy 로 저장
+#     (sklearn 트리 pickle 보다 작고, 로드 시 mmap 으로 열기만 해 거의 즉시 읽힘,
+#      예측값은 원래 파이프라인과 같음)
+# 실행:
+#   python price_model.py lookup               # pipe.pkl 로 예측 조회표 생성 (models/price_lookup.pkl)
+#   python price_model.py lookup --points 13   # 수량/중량 격자점 수
+#   python price_model.py compact              # pipe.pkl → pipe_compact/ 변환 + 동일성 검증 + 크기/로드 시간
+# ============================================================
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import weakref
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import model_registry
+
+
+CATEGORICAL_COLUMNS = ['파일어종', '산지_그룹화', '규격_등급', '포장_분류']
+NUMERIC_COLUMNS = ['수량', '중량']
+FEATURE_COLUMNS = CATEGORICAL_COLUMNS + NUMERIC_COLUMNS
+TARGET_COLUMN = '평균가'
+
+AI_DATA_PATH = os.path.join('data', 'ai데이터가공.csv')
+PIPE_LIBRARIES = ('scikit-learn', 'numpy')
+
+# 학습 파이프라인 종류 (비교: python bench.py pipes)
+#   rf  : 원-핫(밀집 행렬) + MinMax + 랜덤 포레스트 200그루, RF_SAMPLE_ROWS 행 표본으로 학습
+#         예측 구간 = 트리별 예측의 분위수
+#   hgb : 순서형 인코딩 + HistGradientBoosting (범주를 원-핫 없이 직접 분할, 행당 6개 값만 사용)
+#         전체 데이터 학습, 예측 구간 = 학습에서 떼어 둔 보정용 행의 잔차 분위수 (split conformal)
+PIPE_MODEL = 'rf'
+PIPE_MODELS = ('rf', 'hgb')
+RF_SAMPLE_ROWS = 20000
+CALIBRATION_FRACTION = 0.1  # hgb 예측 구간 보정용으로 떼어 둘 비율
+
+# 산출물 경로/레지스트리 키는 종류별로 따로 둠 (종류를 바꿔도 다른 종류의 파일/기록을 덮어쓰거나 읽지 않도록)
+# rf 는 기존 파일 이름(pipe.pkl, price_lookup.pkl)을 그대로 사용
+_PATH_SUFFIX = '' if PIPE_MODEL == 'rf' else f'_{PIPE_MODEL}'
+PIPE_PATH = os.path.join('.', f'pipe{_PATH_SUFFIX}.pkl')
+PIPE_KEY = f'{PIPE_MODEL}/pipe'  # 모델 레지스트리 키
+
+COMPACT_PATH = os.path.join('.', 'pipe_compact')  # 저장할 때마다 이 폴더 아래 새 버전 폴더를 만듦
+COMPACT_KEY = 'rf/pipe_compact'  # 압축 포레스트는 랜덤 포레스트 전용
+
+LOOKUP_PATH = os.path.join('models', f'price_lookup{_PATH_SUFFIX}.pkl')
+LOOKUP_KEY = f'{PIPE_MODEL}/lookup'
+GRID_POINTS = 9  # 수량/중량 격자점 수 (학습 데이터 분위수 위치)
+
+INTERVAL_PERCENTILES = (5, 50, 95)  # 하한 / 중앙값 / 상한
+RESULT_COLUMNS = ['예측가격', '최소예상가격', '중앙예상가격', '최대예상가격']
+BATCH_ROWS = 5000  # 일괄 예측 한 번에 계산할 행 수 (트리별 예측 행렬 메모리 제한)
+
+_leaf_tables = weakref.WeakKeyDictionary()  # 모델 → (리프 값, 트리별 노드 오프셋)
+
+
+def data_fingerprint(df, model=PIPE_MODEL):
+    """학습 데이터 + 파이프라인 종류 지문 (종류를 바꾸면 다시 학습)"""
+    return model_registry.fingerprint(df, {'model': model})
+
+
+def make_pipeline(model=PIPE_MODEL):
+    """학습 전 파이프라인 (전처리 'pre' + 모델 'model')"""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import Pipeline
+
+    if model == 'rf':
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.preprocessing import OneHotEncoder, MinMaxScaler
+        pre = ColumnTransformer([
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False), CATEGORICAL_COLUMNS),
+            ('scaler', MinMaxScaler(), NUMERIC_COLUMNS)
+        ], remainder='drop')
+        estimator = RandomForestRegressor(n_estimators=200, n_jobs=-1, random_state=42)
+    elif model == 'hgb':
+        from sklearn.ensemble import HistGradientBoostingRegressor
+        from sklearn.preprocessing import OrdinalEncoder
+        pre = ColumnTransformer([
+            ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan,
+                                       encoded_missing_value=np.nan), CATEGORICAL_COLUMNS),
+            ('numeric', 'passthrough', NUMERIC_COLUMNS)
+        ], remainder='drop')
+        estimator = HistGradientBoostingRegressor(
+            categorical_features=list(range(len(CATEGORICAL_COLUMNS))), max_iter=300, random_state=42)
+    else:
+        raise ValueError(f'알 수 없는 모델 종류: {model} (가능: {PIPE_MODELS})')
+    return Pipeline(steps=[('pre', pre), ('model', estimator)])
+
+
+def fit_pipeline(df, model=PIPE_MODEL, report=None):
+    """학습 데이터(df) → (학습된 파이프라인, 학습 X, 학습 y)
+
+    rf 는 RF_SAMPLE_ROWS 행 표본, hgb 는 보정용 행을 뺀 전체 데이터로 학습하고
+    보정용 행의 잔차 분위수를 pipe.interval_offsets_ 에 저장 (predict_interval 에서 사용)
+    """
+    required = FEATURE_COLUMNS + [TARGET_COLUMN]
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise RuntimeError(f"데이터에 필요한 컬럼이 없습니다. 필요: {required}. 현재 컬럼: {list(df.columns)}")
+    data = df[required].dropna()
+    pipe = make_pipeline(model)
+
+    calibration = None
+    if model == 'rf' and len(data) > RF_SAMPLE_ROWS:
+        data = data.sample(RF_SAMPLE_ROWS, random_state=42)
+    elif model == 'hgb':
+        calibration = data.sample(frac=CALIBRATION_FRACTION, random_state=42)
+        data = data.drop(calibration.index)
+
+    X, y = data[FEATURE_COLUMNS], data[TARGET_COLUMN].astype(float)
+    if report:
+        report(0.2, f'{model} 학습 중 ({len(data):,}건)')
+    pipe.fit(X, y)
+    if calibration is not None:
+        residuals = calibration[TARGET_COLUMN].astype(float) - pipe.predict(calibration[FEATURE_COLUMNS])
+        pipe.interval_offsets_ = np.percentile(residuals, INTERVAL_PERCENTILES)
+    return pipe, X, y
+
+
+def final_model(pipe):
+    """파이프라인 마지막 단계 (모델)"""
+    return pipe.steps[-1][1]
+
+
+def _leaf_table(model):
+    """전체 트리의 노드 값을 한 배열로 펼친 테이블과 트리별 시작 위치"""
+    table = _leaf_tables.get(model)
+    if table is None:
+        trees = [est.tree_ for est in model.estimators_]
+        values = np.concatenate([tree.value[:, 0, 0] for tree in trees])
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees[:-1]])
+        table = (values, offsets)
+        _leaf_tables[model] = table
+    return table
+
+
+def tree_predictions(model, Xt):
+    """전처리된 입력 → 트리별 예측 행렬 (행 수 × 트리 수)"""
+    values, offsets = _leaf_table(model)
+    return values[model.apply(Xt) + offsets]
+
+
+def predict_interval(pipe, X, percentiles=INTERVAL_PERCENTILES):
+    """X (DataFrame) → (예측값, 하한, 중앙값, 상한) 배열
+
+    트리 앙상블이 아니면 구간 없이 (예측값, None, 예측값, None)
+    """
+    if isinstance(pipe, PriceLookup):
+        return pipe.predict_interval(X)
+    if isinstance(pipe, CompactForest):
+        return _tree_interval(pipe.tree_predictions(X), percentiles)
+    offsets = getattr(pipe, 'interval_offsets_', None)
+    if offsets is not None:
+        pred = pipe.predict(X)
+        lower, median, upper = (pred + offset for offset in offsets)
+        return pred, lower, median, upper
+    model = final_model(pipe)
+    if not hasattr(model, 'estimators_'):
+        pred = pipe.predict(X)
+        return pred, None, pred, None
+    return _tree_interval(tree_predictions(model, pipe[:-1].transform(X)), percentiles)
+
+
+def _tree_interval(preds, percentiles):
+    """트리별 예측 행렬 → (평균, 하한, 중앙값, 상한)"""
+    preds = np.ascontiguousarray(preds)  # 메모리 배치에 따라 평균의 합산 순서가 달라지지 않도록
+    lower, median, upper = np.percentile(preds, percentiles, axis=1)
+    return preds.mean(axis=1), lower, median, upper
+
+
+def predict_batch(pipe, df, batch_rows=BATCH_ROWS):
+    """거래 조건 DataFrame (FEATURE_COLUMNS 포함) → 원본 + RESULT_COLUMNS
+
+    pipe: 학습 파이프라인 또는 PriceLookup
+    BATCH_ROWS 행씩 predict_interval 로 계산 (행마다 모델을 부르지 않음)
+    수량/중량이 숫자가 아니거나 조건이 비어 있는 행(조회표는 없는 조합도)은 예측값 NaN
+    """
+    missing = [c for c in FEATURE_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError(f'필요한 컬럼이 없습니다: {missing}')
+    X = df[FEATURE_COLUMNS].copy()
+    X[NUMERIC_COLUMNS] = X[NUMERIC_COLUMNS].apply(pd.to_numeric, errors='coerce')
+    X[CATEGORICAL_COLUMNS] = X[CATEGORICAL_COLUMNS].astype('string').apply(lambda col: col.str.strip())
+    valid = np.flatnonzero(X.notna().all(axis=1).to_numpy())
+
+    results = np.full((len(df), len(RESULT_COLUMNS)), np.nan)
+    for start in range(0, len(valid), batch_rows):
+        rows = valid[start:start + batch_rows]
+        chunk = X.iloc[rows].astype({c: object for c in CATEGORICAL_COLUMNS})
+        for i, values in enumerate(predict_interval(pipe, chunk)):
+            if values is not None:
+                results[rows, i] = values
+
+    out = df.copy()
+    out[RESULT_COLUMNS] = results
+    return out
+
+
+def feature_importances(pipe):
+    """가격 영향 요인 (Series, 큰 순) - 원-핫 컬럼은 '컬럼=값' 이름, 모델이 지원하지 않으면 None"""
+    if isinstance(pipe, (PriceLookup, CompactForest)):
+        return pipe.importances
+    model = final_model(pipe)
+    if not hasattr(model, 'feature_importances_'):
+        return None
+    fi = model.feature_importances_
+    feat_names = None
+    try:
+        ohe = pipe.named_steps['pre'].named_transformers_['onehot']
+        feat_names = [f'{col}={c}' for col, cats in zip(CATEGORICAL_COLUMNS, ohe.categories_) for c in cats]
+        feat_names += NUMERIC_COLUMNS
+    except (KeyError, AttributeError):
+        feat_names = None
+    if feat_names is None or len(feat_names) != len(fi):
+        feat_names = [f'factor_{i}' for i in range(len(fi))]
+    return pd.Series(fi, index=feat_names).sort_values(ascending=False)
+
+
+def load_pipe(fingerprint, path=PIPE_PATH):
+    """학습 데이터 지문이 레지스트리 기록과 같은 파이프라인 (압축 포레스트 우선, 없으면 None)
+
+    압축 포레스트는 레지스트리에 기록된 버전 폴더에서 읽음 (save_compact 참고)
+    """
+    for key, reader in ((COMPACT_KEY, load_compact), (PIPE_KEY, joblib.load)):
+        if model_registry.is_current(key, fingerprint, PIPE_LIBRARIES):
+            artifact = path if key == PIPE_KEY else model_registry.load_registry()[key]['artifact']
+            try:
+                return reader(artifact)
+            except Exception:
+                pass
+    return None
+
+
+# ============================================================
+# 압축 포레스트
+# ============================================================
+
+class CompactForest:
+    """랜덤 포레스트 파이프라인의 예측 전용 형식
+
+    pre       : 학습된 전처리 단계 (작은 sklearn 객체, joblib 으로 보관)
+    roots     : 트리별 루트 노드 위치 (전체 트리를 한 배열로 이어 붙인 기준)
+    left/right: 자식 노드 위치 (리프는 -1)
+    feature/threshold/missing_left : 분할 컬럼/기준값/결측 방향
+    value     : 노드 예측값
+    importances : 가격 영향 요인 (feature_importances 결과)
+    sklearn 트리와 같은 규칙(입력을 float32 로 바꾼 뒤 x <= threshold 면 왼쪽)으로 내려가므로
+    트리별 예측과 구간은 원래 파이프라인의 predict_interval 과 같음
+    """
+
+    ARRAYS = ('roots', 'left', 'right', 'feature', 'threshold', 'missing_left', 'value')
+
+    def __init__(self, pre, roots, left, right, feature, threshold, missing_left, value, importances=None):
+        self.pre = pre
+        self.roots = roots
+        self.left = left
+        self.right = right
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.value = value
+        self.importances = importances
+        self.artifact = None  # 저장된 버전 폴더 (save_compact 후)
+
+    @classmethod
+    def from_pipeline(cls, pipe):
+        model = final_model(pipe)
+        trees = [est.tree_ for est in model.estimators_]
+        counts = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        def children(attr):
+            # 트리 안 위치 → 이어 붙인 배열 위치 (리프 -1 은 그대로)
+            parts = [np.where(c >= 0, c + o, -1) for c, o in
+                     ((getattr(tree, attr), o) for tree, o in zip(trees, offsets))]
+            return np.concatenate(parts).astype('int32')
+
+        missing = [getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype='uint8')) for tree in trees]
+        return cls(
+            pipe[:-1], offsets.astype('int32'), children('children_left'), children('children_right'),
+            np.concatenate([tree.feature for tree in trees]).astype('int32'),
+            np.concatenate([tree.threshold for tree in trees]),
+            np.concatenate(missing).astype(bool),
+            np.concatenate([tree.value[:, 0, 0] for tree in trees]),
+            feature_importances(pipe),
+        )
+
+    def leaves(self, Xt):
+        """전처리된 입력 → 행 × 트리별 리프 위치 (깊이 단위로 전체 행/트리를 한 번에 이동)"""
+        if hasattr(Xt, 'toarray'):
+            Xt = Xt.toarray()
+        Xt = np.ascontiguousarray(Xt, dtype=np.float32)
+        n, trees, width = len(Xt), len(self.roots), Xt.shape[1]
+        node = np.tile(self.roots, n)  # (행, 트리) 를 펼친 위치별 현재 노드
+        active = np.flatnonzero(self.left[node] >= 0)
+        current = node[active]
+        base = active // trees * width  # 펼친 Xt 에서 그 행의 시작 위치
+        Xt = Xt.ravel()
+        while len(active):
+            x = Xt[base + self.feature[current]]
+            go_left = x <= self.threshold[current]
+            missing = np.isnan(x)
+            if missing.any():
+                go_left[missing] = self.missing_left[current[missing]]
+            current = np.where(go_left, self.left[current], self.right[current])
+            leaf = self.left[current] < 0
+            node[active[leaf]] = current[leaf]
+            internal = ~leaf
+            active, current, base = active[internal], current[internal], base[internal]
+        return node.reshape(n, trees)
+
+    def tree_predictions(self, X):
+        """X (DataFrame) → 트리별 예측 행렬 (행 수 × 트리 수)"""
+        return self.value[self.leaves(self.pre.transform(X))]
+
+    def predict(self, X):
+        return self.tree_predictions(X).mean(axis=1)
+
+    def save(self, directory):
+        """배열마다 <이름>.npy (압축 없음 - mmap 으로 열 수 있도록) + 전처리 단계 pre.joblib"""
+        os.makedirs(directory, exist_ok=True)
+        arrays = {name: getattr(self, name) for name in self.ARRAYS}
+        if self.importances is not None:
+            arrays['importance_names'] = self.importances.index.to_numpy(dtype=str)
+            arrays['importance_values'] = self.importances.to_numpy()
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+        joblib.dump(self.pre, os.path.join(directory, 'pre.joblib'))
+
+
+def load_compact(directory):
+    """배열은 mmap 으로 열기만 함 (예측에 필요한 부분만 그때 디스크에서 읽음)"""
+    def array(name):
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r', allow_pickle=False)
+
+    importances = None
+    if os.path.exists(os.path.join(directory, 'importance_values.npy')):
+        importances = pd.Series(np.asarray(array('importance_values')), index=np.asarray(array('importance_names')))
+    # 전처리 단계는 sklearn 객체라 배열로 저장할 수 없어 joblib(pickle) 로 읽음 - pipe.pkl 과 마찬가지로
+    # 이 앱이 학습해 저장한 파일만 읽는다는 전제 (배열 파일은 allow_pickle=False 로 검사)
+    return CompactForest(joblib.load(os.path.join(directory, 'pre.joblib')),
+                         *(array(name) for name in CompactForest.ARRAYS), importances)
+
+
+def save_compact(pipe, fingerprint, path=COMPACT_PATH):
+    """랜덤 포레스트 파이프라인 → 압축 포레스트 저장 + 레지스트리 기록 (포레스트가 아니면 None)
+
+    여러 파일이라 한 번에 교체할 수 없으므로 path 아래 숨김 폴더에 다 쓴 뒤 새 버전 폴더 이름으로
+    바꾸고 레지스트리가 그 폴더를 가리키게 함 (읽는 쪽은 항상 완성된 한 버전만 봄), 이전 버전은 삭제
+    """
+    if not hasattr(final_model(pipe), 'estimators_'):
+        return None
+    start = time.perf_counter()
+    compact = CompactForest.from_pipeline(pipe)
+    os.makedirs(path, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=path, prefix='.')
+    try:
+        compact.save(tmp_dir)
+        version_dir = os.path.join(path, os.path.basename(tmp_dir).lstrip('.'))
+        os.rename(tmp_dir, version_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    model_registry.record({COMPACT_KEY: model_registry.make_entry(
+        version_dir, fingerprint, PIPE_LIBRARIES, time.perf_counter() - start,
+        {'trees': len(compact.roots), 'nodes': int(len(compact.value))})})
+    # 이전 버전 정리 (다른 프로세스가 mmap 으로 열고 있어도 POSIX 에서는 닫을 때까지 유지,
+    # 지울 수 없으면 다음 저장 때 다시 시도)
+    for name in os.listdir(path):
+        if not name.startswith('.') and name != os.path.basename(version_dir):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    compact.artifact = version_dir
+    return compact
+
+
+def _dir_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+# ============================================================
+# 예측 조회표
+# ============================================================
+
+class PriceLookup:
+    """범주 조건 조합 × 수량/중량 격자의 예측값/구간 (조회 시 수량/중량 방향 쌍선형 보간)
+
+    keys     : 범주 조건 조합 (MultiIndex, CATEGORICAL_COLUMNS 순서, 컬럼별 범주 값의 전체 곱집합)
+    qty      : 수량 격자점 (오름차순)
+    weight   : 중량 격자점 (오름차순)
+    values   : (조합 수, 수량 격자, 중량 격자, RESULT_COLUMNS) float32
+    importances : 가격 영향 요인 (feature_importances 결과, 없으면 None)
+    격자 범위 밖의 수량/중량은 가장 가까운 격자점 값 사용
+    """
+
+    def __init__(self, keys, qty, weight, values, importances=None):
+        self.keys = keys
+        self.qty = qty
+        self.weight = weight
+        self.values = values
+        self.importances = importances
+
+    @staticmethod
+    def _bracket(points, x):
+        """x 를 감싸는 격자 구간 왼쪽 위치와 보간 비율 (범위 밖은 끝점으로 고정)"""
+        if len(points) == 1:
+            return np.zeros(len(x), dtype=np.intp), np.zeros(len(x))
+        x = np.clip(x, points[0], points[-1])
+        i = np.clip(np.searchsorted(points, x, side='right') - 1, 0, len(points) - 2)
+        t = (x - points[i]) / (points[i + 1] - points[i])
+        return i, t
+
+    def predict_interval(self, X):
+        """predict_interval 과 같은 형식 (예측값, 하한, 중앙값, 상한), 없는 조합은 NaN"""
+        k = self.keys.get_indexer(pd.MultiIndex.from_frame(X[CATEGORICAL_COLUMNS].astype(str)))
+        i, ti = self._bracket(self.qty, X['수량'].to_numpy(dtype='float64'))
+        j, tj = self._bracket(self.weight, X['중량'].to_numpy(dtype='float64'))
+        i1 = np.minimum(i + 1, len(self.qty) - 1)
+        j1 = np.minimum(j + 1, len(self.weight) - 1)
+        v = self.values
+        ti, tj = ti[:, None], tj[:, None]
+        out = ((1 - ti) * (1 - tj) * v[k, i, j] + ti * (1 - tj) * v[k, i1, j]
+               + (1 - ti) * tj * v[k, i, j1] + ti * tj * v[k, i1, j1]).astype('float64')
+        out[k < 0] = np.nan
+        return tuple(out.T)
+
+
+def grid_points(values, points=GRID_POINTS):
+    """학습 데이터 분위수 위치의 격자점 (최소/최대 포함, 중복 제거)"""
+    values = pd.to_numeric(values, errors='coerce').dropna().to_numpy(dtype='float64')
+    return np.unique(np.quantile(values, np.linspace(0, 1, points)))
+
+
+def build_lookup(pipe, df, points=GRID_POINTS, batch_rows=BATCH_ROWS):
+    """학습 데이터(df)의 범주 값 전체 곱집합(from_product) × 격자점을 파이프라인으로 예측해 PriceLookup 생성
+
+    학습 데이터에 실제로 나온 조합만이 아니라 컬럼별 범주 값의 모든 조합을 계산
+    (상세 검색 페이지는 어종/산지/규격/포장을 각각 따로 고르므로 어떤 조합이든 조회될 수 있음)
+    """
+    keys = pd.MultiIndex.from_product(
+        [sorted(df[c].dropna().astype(str).unique()) for c in CATEGORICAL_COLUMNS], names=CATEGORICAL_COLUMNS)
+    qty, weight = grid_points(df['수량'], points), grid_points(df['중량'], points)
+
+    grid = keys.to_frame(index=False).loc[np.repeat(np.arange(len(keys)), len(qty) * len(weight))]
+    grid = grid.astype(object).reset_index(drop=True)
+    grid['수량'] = np.tile(np.repeat(qty, len(weight)), len(keys))
+    grid['중량'] = np.tile(weight, len(keys) * len(qty))
+
+    values = np.empty((len(grid), len(RESULT_COLUMNS)), dtype='float32')
+    for start in range(0, len(grid), batch_rows):
+        chunk = grid.iloc[start:start + batch_rows]
+        pred, lower, median, upper = predict_interval(pipe, chunk)
+        if lower is None:
+            lower = upper = pred
+        values[start:start + len(chunk)] = np.column_stack([pred, lower, median, upper])
+    values = values.reshape(len(keys), len(qty), len(weight), len(RESULT_COLUMNS))
+    return PriceLookup(keys, qty, weight, values, feature_importances(pipe))
+
+
+def load_lookup(fingerprint, path=LOOKUP_PATH):
+    """학습 데이터 지문이 레지스트리 기록과 같을 때만 저장된 예측 조회표 (없으면 None)"""
+    if model_registry.is_current(LOOKUP_KEY, fingerprint, PIPE_LIBRARIES):
+        try:
+            return joblib.load(path)
+        except Exception:
+            pass
+    return None
+
+
+def save_lookup(pipe, df, fingerprint, path=LOOKUP_PATH, points=GRID_POINTS, force=False):
+    """예측 조회표 생성 → 저장 + 레지스트리 기록 (같은 조회표는 프로세스 간 잠금으로 한 번만 생성)
+
+    force: False 면 잠금을 얻은 뒤 이미 최신 조회표가 있을 때 그대로 사용
+    """
+    with model_registry.file_lock(path):
+        lookup = None if force else load_lookup(fingerprint, path)
+        if lookup is not None:
+            return lookup
+        start = time.perf_counter()
+        lookup = build_lookup(pipe, df, points)
+        build_seconds = time.perf_counter() - start
+        model_registry.save_artifact(lookup, path)
+        metrics = {'keys': len(lookup.keys), 'grid_rows': int(lookup.values[..., 0].size)}
+        model_registry.record({LOOKUP_KEY: model_registry.make_entry(
+            path, fingerprint, PIPE_LIBRARIES, build_seconds, metrics)})
+    return lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description='상세 검색 예측 도우미')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p = sub.add_parser('lookup', help='범주 조건 전체 조합 × 수량/중량 격자 예측 조회표 생성')
+    p.add_argument('--data', default=AI_DATA_PATH, help='학습 데이터 CSV')
+    p.add_argument('--pipe', default=PIPE_PATH, help='학습된 파이프라인 (상세 검색 예측 페이지에서 학습)')
+    p.add_argument('--points', type=int, default=GRID_POINTS, help='수량/중량 격자점 수')
+
+    p = sub.add_parser('compact', help='pipe.pkl → 압축 포레스트 변환 (예측 동일성 검증, 크기/로드 시간 비교)')
+    p.add_argument('--data', default=AI_DATA_PATH, help='학습 데이터 CSV (동일성 검증에 사용)')
+    p.add_argument('--pipe', default=PIPE_PATH)
+    p.add_argument('--rows', type=int, default=2000, help='동일성 검증 행 수')
+
+    args = parser.parse_args()
+    if args.command == 'lookup':
+        df = pd.read_csv(args.data, usecols=FEATURE_COLUMNS + [TARGET_COLUMN])
+        fingerprint = data_fingerprint(df)
+        if not model_registry.is_current(PIPE_KEY, fingerprint, PIPE_LIBRARIES):
+            parser.error(f'{args.pipe} 가 현재 학습 데이터로 학습되지 않았습니다 (상세 검색 예측 페이지에서 먼저 학습)')
+        start = time.perf_counter()
+        lookup = save_lookup(load_pipe(fingerprint, args.pipe), df, fingerprint, points=args.points, force=True)
+        print(f'예측 조회표: 조합 {len(lookup.keys):,}개 × 격자 {len(lookup.qty)}×{len(lookup.weight)} '
+              f'→ {LOOKUP_PATH} ({time.perf_counter() - start:.1f}s)')
+    elif args.command == 'compact':
+        df = pd.read_csv(args.data, usecols=FEATURE_COLUMNS + [TARGET_COLUMN])
+        fingerprint = data_fingerprint(df)
+        if not model_registry.is_current(PIPE_KEY, fingerprint, PIPE_LIBRARIES):
+            parser.error(f'{args.pipe} 가 현재 학습 데이터로 학습되지 않았습니다 (상세 검색 예측 페이지에서 먼저 학습)')
+        start = time.perf_counter()
+        pipe = joblib.load(args.pipe)
+        pickle_load = time.perf_counter() - start
+        saved = save_compact(pipe, fingerprint)
+        if saved is None:
+            parser.error(f'{args.pipe} 는 랜덤 포레스트가 아닙니다')
+        start = time.perf_counter()
+        compact = load_compact(saved.artifact)
+        compact_load = time.perf_counter() - start
+
+        X = df[FEATURE_COLUMNS].dropna()
+        X = X.sample(min(args.rows, len(X)), random_state=0)
+        same = all(np.array_equal(a, b) for a, b in zip(predict_interval(pipe, X), predict_interval(compact, X)))
+        print(f'{args.pipe}: {os.path.getsize(args.pipe) / 1e6:,.1f}MB, 로드 {pickle_load:.2f}s')
+        print(f'{saved.artifact}: {_dir_size(saved.artifact) / 1e6:,.1f}MB, 로드(mmap) {compact_load:.2f}s')
+        print(f'예측값/구간 동일 ({len(X):,}행): {"예" if same else "아니오"}')
+        if not same:
+            shutil.rmtree(saved.artifact)  # 레지스트리 기록이 남아도 폴더가 없으면 사용하지 않음
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+# ============================================================
+# 🐟 제철 어종 추천 (어종별 최저 평균가 월)
+# ------------------------------------------------------------
+# 작성 목적:
+#   - 어종마다 마스크 + groupby + idxmin 을 반복하던 방식(어종 수 × 행 수) 대신
+#     (어종, 월) groupby 한 번 + 정렬 한 번으로 전체 어종의 최저가 월을 계산
+#   - 월별 거래 건수 min_count 미만인 달은 제외 (표본이 적은 달의 우연한 저가 방지)
+#   - 최저가가 같은 달이 여러 개일 때 고르는 규칙(tie)
+#       'earliest' : 빠른 달 (기존 idxmin 과 동일, 기본값)
+#       'latest'   : 늦은 달
+#       'busiest'  : 거래 건수가 많은 달 (같으면 빠른 달)
+#   - index_by_month 로 best_month 인덱스를 만들어 두면
+#     저번/이번/다음 달 추천은 인덱스 조회(month_picks)만 수행
+# 사용:
+#   table = seasonal.best_months(load_cube('monthly'))   # 원본 거래 행도 가능
+#   index = seasonal.index_by_month(table)
+#   for month in seasonal.target_months(): seasonal.month_picks(index, month)
+# ============================================================
+
+import datetime
+
+import pandas as pd
+
+from data_cube import rollup
+
+
+MIN_COUNT = 10  # 제철 판단에 쓰는 월별 최소 거래 건수
+TIE_RULES = ('earliest', 'latest', 'busiest')
+TOP_N = 6       # 달마다 보여 줄 어종 수
+
+COLUMNS = ['species', 'best_month', 'avg_price']
+
+# tie 규칙 → (파일어종, 평균가) 다음에 붙는 정렬 기준
+_TIE_ORDER = {
+    'earliest': (['month'], [True]),
+    'latest': (['month'], [False]),
+    'busiest': (['count', 'month'], [False, True]),
+}
+
+
+def month_stats(frame):
+    """(파일어종, month) 별 평균가/건수 - 집계 큐브(count 컬럼 있음)와 원본 거래 행 모두 지원"""
+    if 'count' in frame.columns:
+        return rollup(frame, ['파일어종', 'month'])[['파일어종', 'month', '평균가', 'count']]
+    return (frame.groupby(['파일어종', 'month'], sort=True)
+            .agg(평균가=('평균가', 'mean'), count=('평균가', 'size'))
+            .reset_index())
+
+
+def best_months(frame, min_count=MIN_COUNT, tie='earliest'):
+    """어종별 최저 평균가 월 → DataFrame[species, best_month, avg_price] (어종 이름순)"""
+    if tie not in _TIE_ORDER:
+        raise ValueError(f'tie 는 {TIE_RULES} 중 하나여야 합니다: {tie!r}')
+    stats = month_stats(frame)
+    stats = stats[stats['count'] >= min_count]
+
+    tie_cols, tie_asc = _TIE_ORDER[tie]
+    best = (stats.sort_values(['파일어종', '평균가'] + tie_cols, ascending=[True, True] + tie_asc, kind='stable')
+            .drop_duplicates('파일어종'))
+    return pd.DataFrame({
+        'species': best['파일어종'].to_numpy(),
+        'best_month': best['month'].to_numpy(dtype='int64'),
+        'avg_price': best['평균가'].to_numpy().astype('int64'),
+    })
+
+
+# ============================================================
+# 월별 조회
+# ============================================================
+
+def index_by_month(table):
+    """best_month 인덱스 (달 안에서는 평균가 오름차순)"""
+    return table.sort_values(['best_month', 'avg_price'], kind='stable').set_index('best_month')
+
+
+def month_picks(index, month, n=TOP_N):
+    """해당 달이 제철인 어종 중 평균가가 낮은 n개 → DataFrame[species, best_month, avg_price]"""
+    if month not in index.index:
+        return pd.DataFrame(columns=COLUMNS)
+    return index.loc[[month]].head(n).reset_index()[COLUMNS]
+
+
+def target_months(today=None):
+    """[저번 달, 이번 달, 다음 달]"""
+    month = (today or datetime.date.today()).month
+    return [(month - 2) % 12 + 1, month, month % 12 + 1]
+
+
+def recommend(index, today=None, n=TOP_N):
+    """{달: month_picks} - 저번/이번/다음 달"""
+    return {month: month_picks(index, month, n) for month in target_months(today)}